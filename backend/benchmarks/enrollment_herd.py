@@ -0,0 +1,73 @@
+"""Enrollment herd: many students redeeming the same access code at once.
+
+    cd backend && python -m benchmarks.enrollment_herd --students 500 --latency 0.005
+
+Every student enrolls concurrently, then a share of them retry; the report
+checks that each enrollment got exactly one grade row and that retries were
+rejected without writing anything. The memory backend scans its tables on
+every query, so absolute numbers are pessimistic; --latency models the
+database round trip.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import client, summarize, timed
+from benchmarks.seed import make_users
+
+
+def seed_students(server, count: int):
+    students = make_users(server.db.backend, count, "student")
+    return [{"Authorization": f"Bearer {server.create_access_token({'sub': s['id']})}"} for s in students]
+
+
+async def run(students: int, retries: int, latency: float) -> dict:
+    import server
+
+    server.db.backend.latency = latency
+    async with client(server.app) as http:
+        response = await http.post("/api/auth/register", json={
+            "full_name": "Bench Teacher", "email": "teacher@example.com", "password": "bench-pass", "role": "teacher",
+        })
+        teacher = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        course = (await http.post("/api/courses", json={
+            "name": "Bench", "code": "BENCH-1", "description": "", "academic_period": "2025-1",
+        }, headers=teacher)).json()
+        headers = seed_students(server, students)
+        body = {"access_code": course["access_code"]}
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(timed(http.post("/api/courses/enroll", json=body, headers=h)) for h in headers))
+        elapsed = time.perf_counter() - start
+        repeated = await asyncio.gather(*(timed(http.post("/api/courses/enroll", json=body, headers=h)) for h in headers[:retries]))
+
+    backend = server.db.backend
+    enrollments = backend.find("enrollments", course_id=course["id"])
+    grades = backend.find("grades", course_id=course["id"])
+    ok = [elapsed for elapsed, r in results if r.status_code == 200]
+    return {
+        "students": students,
+        "db_latency_ms": latency * 1000,
+        "throughput_per_s": round(len(ok) / elapsed, 1),
+        "enroll": summarize(ok),
+        "errors": sum(1 for _, r in results if r.status_code != 200),
+        "retries_rejected": sum(1 for _, r in repeated if r.status_code == 400),
+        "enrollments": len(enrollments),
+        "grades": len(grades),
+        "orphan_enrollments": len({e["id"] for e in enrollments} - {g["enrollment_id"] for g in grades}),
+        "access_code_cache": server.access_code_cache.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--students", type=int, default=500)
+    parser.add_argument("--retries", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.students, args.retries, args.latency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Login storm: login latency and the latency of unrelated endpoints while bcrypt is busy.
+
+    cd backend && python -m benchmarks.login_storm --logins 200
+"""
+import argparse
+import asyncio
+import json
+
+from benchmarks.common import client, summarize, timed
+
+
+async def probe(http, headers, samples, stop: asyncio.Event, interval: float):
+    while not stop.is_set():
+        elapsed, _ = await timed(http.get("/api/auth/me", headers=headers))
+        samples.append(elapsed)
+        await asyncio.sleep(interval)
+
+
+async def run(logins: int, interval: float) -> dict:
+    import server
+
+    async with client(server.app) as http:
+        response = await http.post("/api/auth/register", json={
+            "full_name": "Bench User", "email": "bench@example.com", "password": "bench-pass", "role": "student",
+        })
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        idle = []
+        stop = asyncio.Event()
+        idle_probe = asyncio.create_task(probe(http, headers, idle, stop, interval))
+        await asyncio.sleep(interval * 50)
+        stop.set()
+        await idle_probe
+
+        busy = []
+        stop = asyncio.Event()
+        busy_probe = asyncio.create_task(probe(http, headers, busy, stop, interval))
+        credentials = {"email": "bench@example.com", "password": "bench-pass"}
+        results = await asyncio.gather(*(timed(http.post("/api/auth/login", json=credentials)) for _ in range(logins)))
+        stop.set()
+        await busy_probe
+
+    ok = [elapsed for elapsed, r in results if r.status_code == 200]
+    return {
+        "logins": logins,
+        "bcrypt_rounds": server.BCRYPT_ROUNDS,
+        "workers": server.PASSWORD_HASH_WORKERS,
+        "max_pending": server.PASSWORD_HASH_MAX_PENDING,
+        "login": summarize(ok),
+        "rejected_503": sum(1 for _, r in results if r.status_code == 503),
+        "unrelated_idle": summarize(idle),
+        "unrelated_during_storm": summarize(busy),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--interval", type=float, default=0.005)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.logins, args.interval)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
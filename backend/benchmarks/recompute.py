@@ -0,0 +1,112 @@
+"""Final grade recompute after a grading scheme change, for 100k enrollments.
+
+    cd backend && python -m benchmarks.recompute --enrollments 100000 --latency 0.002
+
+Seeds the enrollments, switches every course to a new scheme and times:
+the vectorized pass alone, the same computation one row at a time through
+grading.final_grades (the previous per-request path, on a sample and
+extrapolated), and the full recompute_final_grades (paged read, one pass, one
+batched write) with database round trips counted. --latency models the
+database round trip; one write per row would cost `changed` round trips.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import benchmarks.common  # noqa: F401 -- selects the memory backend before server is imported
+
+SCHEME = {
+    "components": [
+        {"column": "corte1", "name": "Parcial 1", "weight": 0.25},
+        {"column": "corte2", "name": "Parcial 2", "weight": 0.25},
+        {"column": "corte3", "name": "Final", "weight": 0.5},
+    ],
+    "decimals": 1,
+    "rounding": "half_up",
+}
+
+
+async def run(enrollments: int, courses: int, sample: int, latency: float, seed: int) -> dict:
+    import server
+    from benchmarks.seed import seed_dataset
+    from grading import cortes_matrix, final_grades, recomputed_finals
+
+    backend = server.db.backend
+    courses_per_student = 5
+    start = time.perf_counter()
+    data = seed_dataset(
+        backend,
+        students=enrollments // courses_per_student,
+        teachers=max(1, courses // 20),
+        courses=courses,
+        courses_per_student=courses_per_student,
+        notifications_per_student=0,
+        password_hash="",
+        rng=random.Random(seed),
+    )
+    seed_seconds = time.perf_counter() - start
+    for course in backend.rows("courses"):
+        course["grading_scheme"] = SCHEME
+    course_rows = backend.rows("courses")
+    position = {course["id"]: i for i, course in enumerate(course_rows)}
+    schemes = [course["grading_scheme"] for course in course_rows]
+    rows = data["grades"]
+
+    start = time.perf_counter()
+    changed = recomputed_finals(rows, schemes, [position[row["course_id"]] for row in rows])
+    vectorized = time.perf_counter() - start
+
+    sampled = rows[:sample]
+    start = time.perf_counter()
+    for row in sampled:
+        final_grades(cortes_matrix([row]), [schemes[position[row["course_id"]]]])
+    per_row = (time.perf_counter() - start) / len(sampled) * len(rows)
+
+    round_trips = [0]
+    previous = server.db.on_query
+
+    def on_query(table, operation, seconds):
+        previous(table, operation, seconds)
+        round_trips[0] += 1
+
+    server.db.on_query = on_query
+    backend.latency = latency
+    start = time.perf_counter()
+    written = await server.recompute_final_grades(course_rows)
+    end_to_end = time.perf_counter() - start
+
+    return {
+        "enrollments": len(rows),
+        "courses": len(course_rows),
+        "seed_seconds": round(seed_seconds, 2),
+        "changed": len(changed),
+        "compute_ms": {
+            "vectorized": round(vectorized * 1000, 1),
+            "per_row_extrapolated": round(per_row * 1000, 1),
+            "speedup": round(per_row / vectorized, 1),
+        },
+        "recompute": {
+            "seconds": round(end_to_end, 2),
+            "rows_written": written,
+            "round_trips": round_trips[0],
+            "per_row_write_round_trips": len(changed),
+            "db_latency_ms": latency * 1000,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--enrollments", type=int, default=100000)
+    parser.add_argument("--courses", type=int, default=400)
+    parser.add_argument("--sample", type=int, default=5000, help="rows timed through the per-row path")
+    parser.add_argument("--latency", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.enrollments, args.courses, args.sample, args.latency, args.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
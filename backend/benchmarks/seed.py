@@ -0,0 +1,85 @@
+import math
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from grading import CORTE_COLUMNS, cortes_matrix, final_grades
+
+GRADE_CHOICES = [None] + [round(0.5 * i, 1) for i in range(11)]
+
+
+def make_users(backend, count: int, role: str, password_hash: str = "", prefix: str = "") -> List[dict]:
+    now = datetime.now(timezone.utc).isoformat()
+    prefix = prefix or role
+    users = [{
+        "id": str(uuid.uuid4()),
+        "email": f"{prefix}{i}@example.com",
+        "full_name": f"{prefix.title()} {i}",
+        "role": role,
+        "password_hash": password_hash,
+        "created_at": now,
+        "reset_token": None,
+        "reset_token_expiry": None,
+    } for i in range(count)]
+    backend.insert_rows("users", users)
+    return users
+
+
+def seed_dataset(backend, students: int, teachers: int, courses: int, courses_per_student: int,
+                 notifications_per_student: int, password_hash: str, rng: random.Random) -> dict:
+    """Writes a realistic dataset straight into a MemoryBackend and returns the rows it created."""
+    student_rows = make_users(backend, students, "student", password_hash)
+    teacher_rows = make_users(backend, teachers, "teacher", password_hash)
+    start = datetime.now(timezone.utc) - timedelta(days=120)
+
+    course_rows = [{
+        "id": str(uuid.uuid4()),
+        "name": f"Curso {i}",
+        "code": f"C-{i:04d}",
+        "description": "",
+        "teacher_id": teacher_rows[i % teachers]["id"],
+        "academic_period": f"2025-{i % 2 + 1}",
+        "access_code": uuid.uuid4().hex[:11],
+        "created_at": start.isoformat(),
+    } for i in range(courses)]
+    backend.insert_rows("courses", course_rows)
+
+    enrollments, grades, notifications = [], [], []
+    for student in student_rows:
+        for course in rng.sample(course_rows, min(courses_per_student, courses)):
+            enrolled_at = (start + timedelta(minutes=rng.randrange(60 * 24 * 30))).isoformat()
+            enrollment = {"id": str(uuid.uuid4()), "student_id": student["id"], "course_id": course["id"], "enrolled_at": enrolled_at}
+            enrollments.append(enrollment)
+            grades.append({
+                "id": str(uuid.uuid4()),
+                "enrollment_id": enrollment["id"],
+                "course_id": course["id"],
+                "student_id": student["id"],
+                "student_name": student["full_name"],
+                **{column: rng.choice(GRADE_CHOICES) for column in CORTE_COLUMNS},
+                "last_updated": enrolled_at,
+            })
+        for i in range(notifications_per_student):
+            notifications.append({
+                "id": str(uuid.uuid4()),
+                "user_id": student["id"],
+                "message": f"Notificación {i}",
+                "type": "grade",
+                "read": rng.random() < 0.7,
+                "created_at": (start + timedelta(hours=i)).isoformat(),
+            })
+    for grade, final in zip(grades, final_grades(cortes_matrix(grades))):
+        grade["final_grade"] = None if math.isnan(final) else float(final)
+    backend.insert_rows("enrollments", enrollments)
+    backend.insert_rows("grades", grades)
+    backend.insert_rows("notifications", notifications)
+
+    return {
+        "students": student_rows,
+        "teachers": teacher_rows,
+        "courses": course_rows,
+        "enrollments": enrollments,
+        "grades": grades,
+        "notifications": notifications,
+    }
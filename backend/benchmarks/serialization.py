@@ -0,0 +1,115 @@
+"""Serialization cost of list responses, per 10k rows.
+
+    cd backend && python -m benchmarks.serialization --rows 10000 --repeat 20
+
+Compares the previous path (a Pydantic model per row, then response_model
+validation and JSONResponse rendering, exactly as FastAPI does it) with the
+RowSerializer fast path, trusted and validating, for courses, grades and
+notifications. Also checks that both paths produce the same JSON.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from benchmarks.common import summarize
+
+
+def course_rows(count: int, rng: random.Random):
+    now = datetime.now(timezone.utc).isoformat()
+    return [{
+        "id": str(uuid.uuid4()), "name": f"Curso {i}", "code": f"C-{i:05d}", "description": "Descripción del curso",
+        "teacher_id": str(uuid.uuid4()), "academic_period": "2025-1", "access_code": uuid.uuid4().hex[:11], "created_at": now,
+    } for i in range(count)]
+
+
+def grade_rows(count: int, rng: random.Random):
+    now = datetime.now(timezone.utc).isoformat()
+    choices = [None, 0, 1, 2.5, 3, 3.5, 4.2, 5]
+    rows = []
+    for i in range(count):
+        cortes = [rng.choice(choices) for _ in range(3)]
+        rows.append({
+            "id": str(uuid.uuid4()), "enrollment_id": str(uuid.uuid4()), "course_id": str(uuid.uuid4()),
+            "student_id": str(uuid.uuid4()), "student_name": f"Estudiante {i}",
+            "corte1": cortes[0], "corte2": cortes[1], "corte3": cortes[2],
+            "final_grade": None if None in cortes else round(cortes[0] * 0.3 + cortes[1] * 0.35 + cortes[2] * 0.35, 2),
+            "last_updated": now,
+        })
+    return rows
+
+
+def notification_rows(count: int, rng: random.Random):
+    start = datetime.now(timezone.utc)
+    return [{
+        "id": str(uuid.uuid4()), "user_id": str(uuid.uuid4()), "message": f"Nueva calificación en Curso {i}",
+        "type": "grade", "read": rng.random() < 0.5, "created_at": (start - timedelta(minutes=i)).isoformat(),
+    } for i in range(count)]
+
+
+def response_field(server, path: str):
+    return next(route.response_field for route in server.app.routes if getattr(route, "path", None) == path)
+
+
+async def model_path(model, field, rows) -> bytes:
+    content = await serialize_response(field=field, response_content=[model(**row) for row in rows])
+    return JSONResponse(content).body
+
+
+async def sample(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = func()
+        if asyncio.iscoroutine(body):
+            body = await body
+        timings.append(time.perf_counter() - start)
+    return body, timings
+
+
+async def run(rows: int, repeat: int, seed: int) -> dict:
+    import server
+    from serialization import RowSerializer
+
+    rng = random.Random(seed)
+    cases = [
+        ("courses", server.Course, "/api/courses/teacher", course_rows(rows, rng)),
+        ("grades", server.Grade, "/api/grades/course/{course_id}", grade_rows(rows, rng)),
+        ("notifications", server.Notification, "/api/notifications", notification_rows(rows, rng)),
+    ]
+    scale = 10000 / rows
+    report = {"rows": rows, "repeat": repeat}
+    for name, model, path, data in cases:
+        field = response_field(server, path)
+        trusted, validating = RowSerializer(model, trusted=True), RowSerializer(model)
+        before, before_t = await sample(lambda: model_path(model, field, data), repeat)
+        fast, fast_t = await sample(lambda: trusted.dumps(data), repeat)
+        checked, checked_t = await sample(lambda: validating.dumps(data), repeat)
+        per_10k = {label: round(summarize(t)["p50_ms"] * scale, 2) for label, t in
+                   (("model_per_row", before_t), ("trusted", fast_t), ("validated", checked_t))}
+        report[name] = {
+            "p50_ms_per_10k_rows": per_10k,
+            "speedup_trusted": round(per_10k["model_per_row"] / per_10k["trusted"], 1),
+            "speedup_validated": round(per_10k["model_per_row"] / per_10k["validated"], 1),
+            "same_json": json.loads(before) == json.loads(fast) == json.loads(checked),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeat, args.seed)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
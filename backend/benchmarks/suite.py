@@ -0,0 +1,258 @@
+"""Benchmark suite: a concurrent scenario mix against the app running in-process.
+
+    cd backend && python -m benchmarks.suite --requests 2000 --concurrency 50 --output bench.json
+    cd backend && python -m benchmarks.suite --compare before.json after.json
+
+Seeds students, teachers, courses, enrollments, grades and notifications
+straight into the memory backend, then runs a weighted mix of login, grade
+entry, student and teacher dashboard loads and PDF export. The JSON report
+has throughput, p50/p95/p99 latency and database round trips per scenario,
+and records the git commit so runs can be compared with --compare. Procedures
+on the memory backend scan whole tables, so dashboard and export latencies
+grow with the seeded size; compare runs made with the same configuration.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from benchmarks.common import client, summarize
+
+PASSWORD = "bench-pass"
+DEFAULT_MIX = "login=1,grade_entry=3,student_dashboard=4,teacher_dashboard=2,pdf_export=1"
+
+_round_trips: ContextVar[Optional[list]] = ContextVar("bench_round_trips", default=None)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Context:
+    def __init__(self, server, http, data: dict, rng: random.Random):
+        self.server = server
+        self.http = http
+        self.data = data
+        self.rng = rng
+        self.enrollments_by_course: Dict[str, List[dict]] = {}
+        for enrollment in data["enrollments"]:
+            self.enrollments_by_course.setdefault(enrollment["course_id"], []).append(enrollment)
+        self.courses_with_students = [c for c in data["courses"] if c["id"] in self.enrollments_by_course]
+
+    def headers(self, user: dict) -> dict:
+        return {"Authorization": f"Bearer {self.server.create_access_token({'sub': user['id']})}"}
+
+    def teacher_of(self, course: dict) -> dict:
+        return next(t for t in self.data["teachers"] if t["id"] == course["teacher_id"])
+
+
+async def login(ctx: Context):
+    user = ctx.rng.choice(ctx.data["students"])
+    return [await ctx.http.post("/api/auth/login", json={"email": user["email"], "password": PASSWORD})]
+
+
+async def grade_entry(ctx: Context):
+    course = ctx.rng.choice(ctx.courses_with_students)
+    enrollment = ctx.rng.choice(ctx.enrollments_by_course[course["id"]])
+    corte = ctx.rng.choice(("corte1", "corte2", "corte3"))
+    body = {"enrollment_id": enrollment["id"], corte: round(ctx.rng.uniform(0, 5), 1)}
+    return [await ctx.http.post("/api/grades", json=body, headers=ctx.headers(ctx.teacher_of(course)))]
+
+
+async def student_dashboard(ctx: Context):
+    headers = ctx.headers(ctx.rng.choice(ctx.data["students"]))
+    return [
+        await ctx.http.get("/api/students/me/overview", headers=headers),
+        await ctx.http.get("/api/notifications", params={"limit": 20}, headers=headers),
+    ]
+
+
+async def teacher_dashboard(ctx: Context):
+    course = ctx.rng.choice(ctx.courses_with_students)
+    headers = ctx.headers(ctx.teacher_of(course))
+    return [
+        await ctx.http.get("/api/courses/teacher", headers=headers),
+        await ctx.http.get(f"/api/courses/{course['id']}/roster", headers=headers),
+    ]
+
+
+async def pdf_export(ctx: Context):
+    course = ctx.rng.choice(ctx.courses_with_students)
+    return [await ctx.http.get(f"/api/grades/export/{course['id']}", headers=ctx.headers(ctx.teacher_of(course)))]
+
+
+SCENARIOS = {
+    "login": login,
+    "grade_entry": grade_entry,
+    "student_dashboard": student_dashboard,
+    "teacher_dashboard": teacher_dashboard,
+    "pdf_export": pdf_export,
+}
+
+
+async def drive(ctx: Context, plan: List[str], concurrency: int) -> Dict[str, dict]:
+    results = {name: {"latency": [], "round_trips": [], "requests": 0, "errors": 0} for name in set(plan)}
+    queue = iter(plan)
+
+    async def worker():
+        for name in queue:
+            counter = [0]
+            token = _round_trips.set(counter)
+            start = time.perf_counter()
+            try:
+                responses = await SCENARIOS[name](ctx)
+            finally:
+                _round_trips.reset(token)
+            result = results[name]
+            result["latency"].append(time.perf_counter() - start)
+            result["round_trips"].append(counter[0])
+            result["requests"] += len(responses)
+            result["errors"] += sum(1 for r in responses if r.status_code >= 400)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+
+async def run(args) -> dict:
+    import server
+
+    backend = server.db.backend
+    backend.latency = args.latency
+    previous = server.db.on_query
+
+    def on_query(table, operation, seconds):
+        if previous is not None:
+            previous(table, operation, seconds)
+        counter = _round_trips.get()
+        if counter is not None:
+            counter[0] += 1
+
+    server.db.on_query = on_query
+
+    from benchmarks.seed import seed_dataset
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    data = seed_dataset(
+        backend,
+        students=args.students,
+        teachers=args.teachers,
+        courses=args.courses,
+        courses_per_student=args.courses_per_student,
+        notifications_per_student=args.notifications_per_student,
+        password_hash=server.pwd_context.hash(PASSWORD),
+        rng=rng,
+    )
+    seed_seconds = time.perf_counter() - start
+
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    plan = rng.choices(names, weights=weights, k=args.requests)
+
+    await server.startup()
+    try:
+        async with client(server.app) as http:
+            ctx = Context(server, http, data, rng)
+            start = time.perf_counter()
+            results = await drive(ctx, plan, args.concurrency)
+            elapsed = time.perf_counter() - start
+    finally:
+        await server.notification_queue.stop()
+
+    scenarios = {}
+    for name, result in sorted(results.items()):
+        trips = result["round_trips"]
+        scenarios[name] = {
+            "operations": len(result["latency"]),
+            "requests": result["requests"],
+            "errors": result["errors"],
+            "throughput_per_s": round(len(result["latency"]) / elapsed, 1),
+            **summarize(result["latency"]),
+            "round_trips_mean": round(sum(trips) / len(trips), 2),
+            "round_trips_max": max(trips),
+        }
+    return {
+        "commit": git_commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "bcrypt_rounds": server.BCRYPT_ROUNDS,
+        "seed": {
+            "seconds": round(seed_seconds, 2),
+            **{name: len(rows) for name, rows in data.items()},
+        },
+        "total": {
+            "operations": len(plan),
+            "seconds": round(elapsed, 2),
+            "throughput_per_s": round(len(plan) / elapsed, 1),
+            "errors": sum(s["errors"] for s in scenarios.values()),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def compare(before_path: str, after_path: str) -> str:
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    lines = [f"{'scenario':<20}{'metric':<18}{before.get('commit') or 'before':>12}{after.get('commit') or 'after':>12}{'change':>10}"]
+    for name in sorted(set(before["scenarios"]) | set(after["scenarios"])):
+        old, new = before["scenarios"].get(name, {}), after["scenarios"].get(name, {})
+        for metric in ("throughput_per_s", "p50_ms", "p95_ms", "p99_ms", "round_trips_mean"):
+            a, b = old.get(metric), new.get(metric)
+            change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else "-"
+            lines.append(f"{name:<20}{metric:<18}{str(a):>12}{str(b):>12}{change:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=3000)
+    parser.add_argument("--teachers", type=int, default=100)
+    parser.add_argument("--courses", type=int, default=300)
+    parser.add_argument("--courses-per-student", type=int, default=5)
+    parser.add_argument("--notifications-per-student", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000, help="scenario operations to run")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--latency", type=float, default=0.002, help="simulated database round trip in seconds")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark-report.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        print(compare(*args.compare))
+        return
+
+    os.environ.setdefault("BCRYPT_ROUNDS", str(args.bcrypt_rounds))
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report["total"], indent=2))
+    for name, scenario in report["scenarios"].items():
+        print(f"{name:<20} {scenario['throughput_per_s']:>8}/s  p50 {scenario['p50_ms']:>8}ms  p95 {scenario['p95_ms']:>8}ms  "
+              f"p99 {scenario['p99_ms']:>8}ms  round trips {scenario['round_trips_mean']}")
+    print(f"report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds (None disables expiry).
+
+    With `max_bytes` set, values must support len() and the cache also evicts
+    least recently used entries once their summed length exceeds the limit.
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._loading: dict = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key: Hashable):
+        value, _ = self._entries.pop(key)
+        if self.max_bytes is not None:
+            self.bytes -= len(value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key, MISSING)
+        if entry is not MISSING and (entry[1] is None or entry[1] > time.monotonic()):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if entry is not MISSING:
+            self._remove(key)
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        if key in self._entries:
+            self._remove(key)
+        if self.max_bytes is not None:
+            if len(value) > self.max_bytes:
+                return
+            self.bytes += len(value)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = (value, expires)
+        while len(self._entries) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """get(), falling back to `load()` on a miss. Concurrent misses for the
+        same key share a single load; None results are returned but not cached."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        pending = self._loading.get(key)
+        if pending is None:
+            pending = self._loading[key] = asyncio.ensure_future(self._load(key, load))
+        return await asyncio.shield(pending)
+
+    async def _load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await load()
+            # An invalidate() while loading drops the task, so stale results are not stored
+            if value is not None and self._loading.get(key) is task:
+                self.set(key, value)
+            return value
+        finally:
+            if self._loading.get(key) is task:
+                del self._loading[key]
+
+    def invalidate(self, key: Hashable):
+        self._loading.pop(key, None)
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._loading.clear()
+        self._entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        stats = {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+        if self.max_bytes is not None:
+            stats.update({"bytes": self.bytes, "max_bytes": self.max_bytes})
+        return stats
@@ -0,0 +1,720 @@
+import asyncio
+import math
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.exceptions import APIError
+
+from grading import CORTE_COLUMNS, accumulate_summaries, cortes_matrix, empty_summary, final_grades
+
+CHAIN_METHODS = {
+    "select", "insert", "upsert", "update", "delete",
+    "eq", "neq", "gt", "gte", "lt", "lte", "in_", "is_",
+    "order", "limit", "offset", "range",
+}
+OPERATIONS = {"select", "insert", "upsert", "update", "delete"}
+
+# SQLSTATE codes raised by the stored procedures in supabase/migrations.
+UNIQUE_VIOLATION = "23505"
+FOREIGN_KEY_VIOLATION = "23503"
+NOT_FOUND = "P0002"
+FORBIDDEN = "42501"
+INVALID_PARAMETER = "22023"
+INVALID_TEXT_REPRESENTATION = "22P02"
+SERIALIZATION_FAILURE = "40001"
+
+
+class QueryResult:
+    def __init__(self, data: List[dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class Query:
+    """Backend-agnostic query: records the postgrest-style call chain and replays it on execute()."""
+
+    def __init__(self, database: "Database", target: str, rpc_params: Optional[dict] = None):
+        self._database = database
+        self._target = target
+        self._rpc_params = rpc_params
+        self._calls = []
+        self.operation = "rpc" if rpc_params is not None else "select"
+
+    def __getattr__(self, name):
+        if name not in CHAIN_METHODS:
+            raise AttributeError(name)
+
+        def chain(*args, **kwargs):
+            if name in OPERATIONS:
+                self.operation = name
+            self._calls.append((name, args, kwargs))
+            return self
+        return chain
+
+    @property
+    def table(self) -> str:
+        return self._target
+
+    async def execute(self):
+        return await self._database.execute(self)
+
+    def copy(self) -> "Query":
+        query = Query(self._database, self._target, self._rpc_params)
+        query._calls = list(self._calls)
+        query.operation = self.operation
+        return query
+
+    async def pages(self, page_size: int = 1000):
+        """Yields the result in pages of `page_size` rows; the query should have a stable order()."""
+        start = 0
+        while True:
+            result = await self.copy().range(start, start + page_size - 1).execute()
+            if result.data:
+                yield result.data
+            if len(result.data) < page_size:
+                return
+            start += page_size
+
+    async def fetch_all(self, page_size: int = 1000) -> List[dict]:
+        rows = []
+        async for page in self.pages(page_size):
+            rows.extend(page)
+        return rows
+
+    def build(self, backend):
+        if self._rpc_params is not None:
+            builder = backend.rpc(self._target, self._rpc_params)
+        else:
+            builder = backend.table(self._target)
+        for name, args, kwargs in self._calls:
+            builder = getattr(builder, name)(*args, **kwargs)
+        return builder
+
+
+class Database:
+    def __init__(self, backend, on_query: Optional[Callable[[str, str, float], None]] = None):
+        self.backend = backend
+        # called with (table or function name, operation, seconds) after every call
+        self.on_query = on_query
+
+    def table(self, name: str) -> Query:
+        return Query(self, name)
+
+    def rpc(self, name: str, params: dict) -> Query:
+        return Query(self, name, params)
+
+    async def execute(self, query: Query):
+        if self.on_query is None:
+            return await query.build(self.backend).execute()
+        start = time.perf_counter()
+        try:
+            return await query.build(self.backend).execute()
+        finally:
+            self.on_query(query.table, query.operation, time.perf_counter() - start)
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+
+class PooledPostgrestClient(AsyncPostgrestClient):
+    def __init__(self, base_url: str, *, headers: Dict[str, str], timeout: float, max_connections: int):
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        super().__init__(base_url, headers=headers, timeout=timeout)
+
+    def create_session(self, base_url, headers, timeout):
+        return httpx.AsyncClient(base_url=base_url, headers=headers, timeout=timeout, limits=self._limits)
+
+
+class SupabaseBackend:
+    def __init__(self, url: str, key: str, max_connections: int = 100, timeout: float = 10.0):
+        self.client = PooledPostgrestClient(
+            f"{url}/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+            },
+            timeout=timeout,
+            max_connections=max_connections,
+        )
+
+    def table(self, name: str):
+        return self.client.from_(name)
+
+    def rpc(self, name: str, params: dict):
+        return self.client.rpc(name, params)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+# In-process stand-in for the Supabase tables, used by tests and benchmarks.
+# It mirrors the subset of PostgREST used by the API together with the
+# unique constraints, defaults and ON DELETE CASCADE rules of the migrations.
+
+UNIQUE_KEYS = {
+    "users": [("id",), ("email",)],
+    "courses": [("id",), ("code",), ("access_code",)],
+    "enrollments": [("id",), ("student_id", "course_id")],
+    "grades": [("id",), ("enrollment_id",)],
+    "notifications": [("id",)],
+    "course_grade_summaries": [("course_id",)],
+}
+
+CASCADES = {
+    "users": [("courses", "teacher_id"), ("enrollments", "student_id"), ("grades", "student_id"), ("notifications", "user_id")],
+    "courses": [("enrollments", "course_id"), ("grades", "course_id"), ("course_grade_summaries", "course_id")],
+    "enrollments": [("grades", "enrollment_id")],
+}
+
+DEFAULTS = {
+    "notifications": {"read": False},
+}
+
+PROCEDURES = {}
+TRIGGERS: Dict[str, List[Callable]] = {}
+
+
+def procedure(name: str):
+    def register(func):
+        PROCEDURES[name] = func
+        return func
+    return register
+
+
+def trigger(table: str):
+    """Statement-level AFTER trigger: called with the old and new versions of the rows written."""
+    def register(func):
+        TRIGGERS.setdefault(table, []).append(func)
+        return func
+    return register
+
+
+def api_error(code: str, message: str) -> APIError:
+    return APIError({"code": code, "message": message, "details": None, "hint": None})
+
+
+def unique_violation(table: str, columns) -> APIError:
+    return api_error(UNIQUE_VIOLATION, f'duplicate key value violates unique constraint "{table}_{"_".join(columns)}_key"')
+
+
+class MemoryQuery:
+    def __init__(self, backend: "MemoryBackend", table: str):
+        self._backend = backend
+        self._table = table
+        self._operation = "select"
+        self._columns = None
+        self._count = None
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._offset = 0
+
+    def select(self, *columns, count=None):
+        self._operation = "select"
+        self._columns = parse_columns(columns)
+        self._count = count
+        return self
+
+    def insert(self, json, *, count=None, returning=None, upsert=False):
+        self._operation = "upsert" if upsert else "insert"
+        self._payload = json if isinstance(json, list) else [json]
+        self._count = count
+        return self
+
+    def upsert(self, json, *, count=None, returning=None, ignore_duplicates=False, on_conflict=""):
+        self._operation = "upsert"
+        self._payload = json if isinstance(json, list) else [json]
+        self._count = count
+        self._on_conflict = tuple(c.strip() for c in on_conflict.split(",")) if on_conflict else ("id",)
+        return self
+
+    def update(self, json, *, count=None, returning=None):
+        self._operation = "update"
+        self._payload = json
+        self._count = count
+        return self
+
+    def delete(self, *, count=None, returning=None):
+        self._operation = "delete"
+        self._count = count
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column, value):
+        self._filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def gte(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] < value)
+        return self
+
+    def lte(self, column, value):
+        self._filters.append(lambda row: row.get(column) is not None and row[column] <= value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self._filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def is_(self, column, value):
+        value = None if value in (None, "null") else value
+        self._filters.append(lambda row: row.get(column) is value)
+        return self
+
+    def order(self, column, *, desc=False, nullsfirst=False, foreign_table=None):
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size, *, foreign_table=None):
+        self._limit = size
+        return self
+
+    def offset(self, size):
+        self._offset = size
+        return self
+
+    def range(self, start, end):
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    async def execute(self) -> QueryResult:
+        if self._backend.latency:
+            await asyncio.sleep(self._backend.latency)
+        handler = getattr(self._backend, f"_{self._operation}")
+        return handler(self)
+
+    def matches(self, row: dict) -> bool:
+        return all(check(row) for check in self._filters)
+
+
+class MemoryRPC:
+    def __init__(self, backend: "MemoryBackend", name: str, params: dict):
+        self._backend = backend
+        self._name = name
+        self._params = params
+
+    async def execute(self) -> QueryResult:
+        if self._backend.latency:
+            await asyncio.sleep(self._backend.latency)
+        if self._name not in PROCEDURES:
+            raise api_error("PGRST202", f"Could not find the function {self._name}")
+        data = PROCEDURES[self._name](self._backend, **self._params)
+        return QueryResult(data)
+
+
+def parse_columns(columns) -> Optional[List[str]]:
+    names = [c.strip() for part in columns for c in part.split(",") if c.strip()]
+    if not names or "*" in names:
+        return None
+    return names
+
+
+def sort_rows(rows: List[dict], order) -> List[dict]:
+    for column, desc, nullsfirst in reversed(order):
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        present.sort(key=lambda r: r[column], reverse=desc)
+        rows = missing + present if nullsfirst else present + missing
+    return rows
+
+
+class MemoryBackend:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[dict]] = {name: [] for name in UNIQUE_KEYS}
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> MemoryRPC:
+        return MemoryRPC(self, name, params)
+
+    async def aclose(self):
+        pass
+
+    def rows(self, table: str) -> List[dict]:
+        return self.tables.setdefault(table, [])
+
+    def find(self, table: str, **values) -> List[dict]:
+        return [row for row in self.rows(table) if all(row.get(k) == v for k, v in values.items())]
+
+    def check_unique(self, table: str, row: dict, ignore: Optional[dict] = None):
+        for columns in UNIQUE_KEYS.get(table, []):
+            key = tuple(row.get(c) for c in columns)
+            if None in key:
+                continue
+            if ignore is not None and tuple(ignore.get(c) for c in columns) == key:
+                continue
+            for other in self.rows(table):
+                if other is not ignore and tuple(other.get(c) for c in columns) == key:
+                    raise unique_violation(table, columns)
+
+    def new_row(self, table: str, values: dict) -> dict:
+        return {"id": str(uuid.uuid4()), **DEFAULTS.get(table, {}), **values}
+
+    def insert_rows(self, table: str, rows: List[dict]) -> List[dict]:
+        # one pass over the table per constraint, so batch inserts stay linear
+        for columns in UNIQUE_KEYS.get(table, []):
+            taken = {tuple(other.get(c) for c in columns) for other in self.rows(table)}
+            for row in rows:
+                key = tuple(row.get(c) for c in columns)
+                if None in key:
+                    continue
+                if key in taken:
+                    raise unique_violation(table, columns)
+                taken.add(key)
+        self.rows(table).extend(rows)
+        self.fire(table, [], rows)
+        return rows
+
+    def update_rows(self, table: str, changes: List[tuple]):
+        """Applies (row, values) pairs in place."""
+        old = [dict(row) for row, _ in changes]
+        for row, values in changes:
+            row.update(values)
+        self.fire(table, old, [row for row, _ in changes])
+
+    def delete_rows(self, table: str, doomed: List[dict]):
+        ids = {id(row) for row in doomed}
+        keys = {row.get("id") for row in doomed}
+        self.tables[table] = [row for row in self.rows(table) if id(row) not in ids]
+        for child, column in CASCADES.get(table, []):
+            self.delete_rows(child, [row for row in self.rows(child) if row.get(column) in keys])
+        self.fire(table, doomed, [])
+
+    def fire(self, table: str, old: List[dict], new: List[dict]):
+        if old or new:
+            for func in TRIGGERS.get(table, []):
+                func(self, old, new)
+
+    def _project(self, query: MemoryQuery, rows: List[dict]) -> List[dict]:
+        if query._columns is None:
+            return [dict(row) for row in rows]
+        return [{c: row.get(c) for c in query._columns} for row in rows]
+
+    def _select(self, query: MemoryQuery) -> QueryResult:
+        rows = sort_rows([row for row in self.rows(query._table) if query.matches(row)], query._order)
+        count = len(rows) if query._count else None
+        end = None if query._limit is None else query._offset + query._limit
+        return QueryResult(self._project(query, rows[query._offset:end]), count)
+
+    def _insert(self, query: MemoryQuery) -> QueryResult:
+        inserted = self.insert_rows(query._table, [self.new_row(query._table, values) for values in query._payload])
+        return QueryResult([dict(row) for row in inserted], len(inserted) if query._count else None)
+
+    def _upsert(self, query: MemoryQuery) -> QueryResult:
+        conflict = query._on_conflict or ("id",)
+        index = {tuple(row.get(c) for c in conflict): row for row in self.rows(query._table)}
+        written, updates, inserts = [], [], []
+        for values in query._payload:
+            existing = index.get(tuple(values.get(c) for c in conflict))
+            if existing is None:
+                row = self.new_row(query._table, values)
+                inserts.append(row)
+            else:
+                self.check_unique(query._table, {**existing, **values}, ignore=existing)
+                updates.append((existing, values))
+                row = existing
+            written.append(row)
+        self.insert_rows(query._table, inserts)
+        self.update_rows(query._table, updates)
+        return QueryResult([dict(row) for row in written], len(written) if query._count else None)
+
+    def _update(self, query: MemoryQuery) -> QueryResult:
+        targets = [row for row in self.rows(query._table) if query.matches(row)]
+        for row in targets:
+            self.check_unique(query._table, {**row, **query._payload}, ignore=row)
+        self.update_rows(query._table, [(row, query._payload) for row in targets])
+        return QueryResult([dict(row) for row in targets], len(targets) if query._count else None)
+
+    def _delete(self, query: MemoryQuery) -> QueryResult:
+        targets = [row for row in self.rows(query._table) if query.matches(row)]
+        self.delete_rows(query._table, targets)
+        return QueryResult([dict(row) for row in targets], len(targets) if query._count else None)
+
+
+# Python equivalents of the SQL functions, executed against the memory tables.
+
+@procedure("upsert_grade")
+def upsert_grade(backend: MemoryBackend, p_teacher_id, p_enrollment_id, p_corte1=None, p_corte2=None, p_corte3=None,
+                 p_expected_last_updated=None):
+    enrollment = next(iter(backend.find("enrollments", id=p_enrollment_id)), None)
+    if enrollment is None:
+        raise api_error(NOT_FOUND, "Inscripción no encontrada")
+    course = backend.find("courses", id=enrollment["course_id"])[0]
+    if course["teacher_id"] != p_teacher_id:
+        raise api_error(FORBIDDEN, "No autorizado")
+    grade = next(iter(backend.find("grades", enrollment_id=p_enrollment_id)), None)
+    if grade is None:
+        raise api_error(NOT_FOUND, "Calificación no encontrada")
+    if p_expected_last_updated is not None and not same_timestamp(grade["last_updated"], p_expected_last_updated):
+        raise api_error(SERIALIZATION_FAILURE, "La calificación fue modificada")
+
+    values = {column: value for column, value in zip(CORTE_COLUMNS, (p_corte1, p_corte2, p_corte3)) if value is not None}
+    final = final_grades(cortes_matrix([{**grade, **values}]), [course.get("grading_scheme")])[0]
+    if not math.isnan(final):
+        values["final_grade"] = float(final)
+    values["last_updated"] = datetime.now(timezone.utc).isoformat()
+    backend.update_rows("grades", [(grade, values)])
+    return {**grade, "course_name": course["name"]}
+
+
+@procedure("bulk_upsert_grades")
+def bulk_upsert_grades(backend: MemoryBackend, p_teacher_id, p_course_id, p_rows):
+    course = next(iter(backend.find("courses", id=p_course_id)), None)
+    if course is None:
+        raise api_error(NOT_FOUND, "Curso no encontrado")
+    if course["teacher_id"] != p_teacher_id:
+        raise api_error(FORBIDDEN, "No autorizado")
+
+    grades = {grade["enrollment_id"]: grade for grade in backend.find("grades", course_id=p_course_id)}
+    now = datetime.now(timezone.utc).isoformat()
+    results, changes = [], []
+    for position, row in enumerate(p_rows):
+        grade = grades.get(row["enrollment_id"])
+        if grade is None:
+            results.append({"position": position, "status": "not_found"})
+            continue
+        if row.get("expected_last_updated") is not None and not same_timestamp(grade["last_updated"], row["expected_last_updated"]):
+            results.append({"position": position, "status": "conflict"})
+            continue
+        values = {column: row[column] for column in CORTE_COLUMNS if row.get(column) is not None}
+        changes.append((grade, values))
+        results.append({"position": position, "status": "ok", "grade": grade})
+
+    if changes:
+        finals = final_grades(cortes_matrix([{**grade, **values} for grade, values in changes]), [course.get("grading_scheme")])
+        for (_, values), final in zip(changes, finals):
+            if not math.isnan(final):
+                values["final_grade"] = float(final)
+            values["last_updated"] = now
+        backend.update_rows("grades", changes)
+    return [{**result, "grade": dict(result["grade"])} if "grade" in result else result for result in results]
+
+
+@procedure("set_final_grades")
+def set_final_grades(backend: MemoryBackend, p_ids, p_final_grades, p_last_updated):
+    expected = {grade_id: (final, stamp) for grade_id, final, stamp in zip(p_ids, p_final_grades, p_last_updated)}
+    now = datetime.now(timezone.utc).isoformat()
+    changes = [
+        (grade, {"final_grade": expected[grade["id"]][0], "last_updated": now})
+        for grade in backend.rows("grades")
+        if grade["id"] in expected
+        and same_timestamp(grade["last_updated"], expected[grade["id"]][1])
+        and grade.get("final_grade") != expected[grade["id"]][0]
+    ]
+    changed = {grade["id"] for grade, _ in changes}
+    backend.update_rows("grades", changes)
+    return {"changed": len(changes), "skipped": [grade_id for grade_id in p_ids if grade_id not in changed]}
+
+
+@procedure("enroll_student")
+def enroll_student(backend: MemoryBackend, p_student_id, p_student_name, p_course_id):
+    if not backend.find("courses", id=p_course_id):
+        raise api_error(FOREIGN_KEY_VIOLATION, 'insert or update on table "enrollments" violates foreign key constraint')
+    now = datetime.now(timezone.utc).isoformat()
+    enrollment = backend.new_row("enrollments", {"student_id": p_student_id, "course_id": p_course_id, "enrolled_at": now})
+    backend.insert_rows("enrollments", [enrollment])
+    backend.insert_rows("grades", [backend.new_row("grades", {
+        "enrollment_id": enrollment["id"],
+        "course_id": p_course_id,
+        "student_id": p_student_id,
+        "student_name": p_student_name,
+        **{column: None for column in CORTE_COLUMNS},
+        "final_grade": None,
+        "last_updated": now,
+    })])
+    return dict(enrollment)
+
+
+@procedure("student_overview")
+def student_overview(backend: MemoryBackend, p_student_id):
+    enrollments = sorted(backend.find("enrollments", student_id=p_student_id), key=lambda e: (e["enrolled_at"], e["course_id"]))
+    courses = {course["id"]: course for course in backend.rows("courses")}
+    grades = {grade["enrollment_id"]: grade for grade in backend.find("grades", student_id=p_student_id)}
+    return {
+        "courses": [
+            {**courses[e["course_id"]], "grade": dict(grades[e["id"]]) if e["id"] in grades else None}
+            for e in enrollments if e["course_id"] in courses
+        ],
+        "unread_notifications": len(backend.find("notifications", user_id=p_student_id, read=False)),
+    }
+
+
+ROSTER_SORT_KEYS = ("student_name", "email", "enrolled_at", "corte1", "corte2", "corte3", "final_grade")
+
+
+def same_timestamp(a, b) -> bool:
+    try:
+        return datetime.fromisoformat(a) == datetime.fromisoformat(b)
+    except (TypeError, ValueError):
+        return False
+
+
+def roster_sort_key(row: dict, sort: str):
+    if sort in ("student_name", "email"):
+        return row[sort].lower()
+    if sort == "enrolled_at":
+        return row[sort]
+    return -1.0 if row[sort] is None else float(row[sort])
+
+
+@procedure("course_roster")
+def course_roster(backend: MemoryBackend, p_teacher_id, p_course_id, p_sort="student_name", p_desc=False,
+                  p_limit=100, p_offset=0, p_after_key=None, p_after_id=None):
+    course = next(iter(backend.find("courses", id=p_course_id)), None)
+    if course is None:
+        raise api_error(NOT_FOUND, "Curso no encontrado")
+    if course["teacher_id"] != p_teacher_id:
+        raise api_error(FORBIDDEN, "No autorizado")
+    if p_sort not in ROSTER_SORT_KEYS:
+        raise api_error(INVALID_PARAMETER, "Campo de ordenamiento inválido")
+
+    users = {user["id"]: user for user in backend.rows("users")}
+    grades = {grade["enrollment_id"]: grade for grade in backend.find("grades", course_id=p_course_id)}
+    roster = []
+    for enrollment in backend.find("enrollments", course_id=p_course_id):
+        user = users.get(enrollment["student_id"])
+        if user is None:
+            continue
+        grade = grades.get(enrollment["id"], {})
+        row = {
+            "enrollment_id": enrollment["id"],
+            "enrolled_at": enrollment["enrolled_at"],
+            "student_id": user["id"],
+            "student_name": user["full_name"],
+            "email": user["email"],
+            "grade_id": grade.get("id"),
+            **{column: grade.get(column) for column in (*CORTE_COLUMNS, "final_grade", "last_updated")},
+        }
+        row["sort_key"] = roster_sort_key(row, p_sort)
+        roster.append(row)
+
+    roster.sort(key=lambda row: (row["sort_key"], row["enrollment_id"]), reverse=p_desc)
+    page = roster
+    if p_after_key is not None:
+        try:
+            after = (float(p_after_key) if p_sort in (*CORTE_COLUMNS, "final_grade") else p_after_key, p_after_id)
+        except ValueError:
+            raise api_error(INVALID_TEXT_REPRESENTATION, f'invalid input syntax for type numeric: "{p_after_key}"')
+        if p_desc:
+            page = [row for row in page if (row["sort_key"], row["enrollment_id"]) < after]
+        else:
+            page = [row for row in page if (row["sort_key"], row["enrollment_id"]) > after]
+    page = page[p_offset:p_offset + p_limit]
+    return {
+        "total": len(roster),
+        "rows": [{**row, "sort_key": str(row["sort_key"])} for row in page],
+    }
+
+
+@procedure("course_grades_version")
+def course_grades_version(backend: MemoryBackend, p_course_id):
+    grades = backend.find("grades", course_id=p_course_id)
+    return {
+        "count": len(grades),
+        "last_updated": max((grade["last_updated"] for grade in grades if grade.get("last_updated")), default=None),
+    }
+
+
+@trigger("grades")
+def apply_grade_summary_changes(backend: MemoryBackend, old_rows, new_rows):
+    delta = accumulate_summaries(accumulate_summaries({}, new_rows), old_rows, sign=-1)
+    courses = {course["id"] for course in backend.rows("courses")}
+    summaries = {summary["course_id"]: summary for summary in backend.rows("course_grade_summaries")}
+    now = datetime.now(timezone.utc).isoformat()
+    inserts = []
+    for course_id, change in delta.items():
+        if course_id not in courses:
+            continue
+        summary = summaries.get(course_id)
+        if summary is None:
+            inserts.append({**change, "updated_at": now})
+            continue
+        for field, value in change.items():
+            if field != "course_id":
+                summary[field] = round(summary[field] + value, 4)
+        summary["updated_at"] = now
+    backend.insert_rows("course_grade_summaries", inserts)
+
+
+@procedure("course_grade_summary")
+def course_grade_summary(backend: MemoryBackend, p_course_id):
+    summary = next(iter(backend.find("course_grade_summaries", course_id=p_course_id)), None)
+    return dict(summary) if summary is not None else {"course_id": p_course_id, "students": 0, "pending_cortes": 0, "updated_at": None}
+
+
+@procedure("rebuild_course_grade_summaries")
+def rebuild_course_grade_summaries(backend: MemoryBackend, p_course_id=None, p_apply=True):
+    course_ids = [c["id"] for c in backend.rows("courses") if p_course_id is None or c["id"] == p_course_id]
+    grades = [g for g in backend.rows("grades") if p_course_id is None or g["course_id"] == p_course_id]
+    expected = accumulate_summaries({course_id: empty_summary(course_id) for course_id in course_ids}, grades)
+    stored = {s["course_id"]: s for s in backend.rows("course_grade_summaries") if s["course_id"] in expected}
+    drift = []
+    for course_id, summary in expected.items():
+        current = stored.get(course_id)
+        if current is None:
+            if summary["students"]:
+                drift.append({"course_id": course_id, "stored": None, "expected": summary})
+        elif any(current[field] != value for field, value in summary.items()):
+            drift.append({"course_id": course_id, "stored": {k: v for k, v in current.items() if k != "updated_at"}, "expected": summary})
+
+    if p_apply:
+        now = datetime.now(timezone.utc).isoformat()
+        backend.update_rows("course_grade_summaries", [
+            (stored[course_id], {**summary, "updated_at": now}) for course_id, summary in expected.items() if course_id in stored
+        ])
+        backend.insert_rows("course_grade_summaries", [
+            {**summary, "updated_at": now} for course_id, summary in expected.items() if course_id not in stored
+        ])
+    return drift
+
+
+@procedure("notifications_page")
+def notifications_page(backend: MemoryBackend, p_user_id, p_limit, p_before_created_at=None, p_before_id=None):
+    rows = backend.find("notifications", user_id=p_user_id)
+    if p_before_created_at is not None:
+        cursor = (p_before_created_at, p_before_id)
+        rows = [row for row in rows if (row["created_at"], row["id"]) < cursor]
+    rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    return [dict(row) for row in rows[:p_limit]]
+
+
+@procedure("mark_notifications_read")
+def mark_notifications_read(backend: MemoryBackend, p_user_id, p_ids=None):
+    ids = None if p_ids is None else set(p_ids)
+    count = 0
+    for row in backend.find("notifications", user_id=p_user_id, read=False):
+        if ids is None or row["id"] in ids:
+            row["read"] = True
+            count += 1
+    return count
+
+
+def create_database(kind: str, url: str = "", key: str = "", **options) -> Database:
+    if kind == "memory":
+        return Database(MemoryBackend(**options))
+    if kind == "supabase":
+        return Database(SupabaseBackend(url, key, **options))
+    raise ValueError(f"Unknown data backend: {kind}")
@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from reports import render_grades_pdf_timed
+
+logger = logging.getLogger(__name__)
+
+
+class ExportQueueFull(Exception):
+    pass
+
+
+class ExportJob:
+    def __init__(self, teacher_id: str, courses: List[dict]):
+        self.id = str(uuid.uuid4())
+        self.teacher_id = teacher_id
+        self.courses = courses
+        self.status = "pending"
+        self.completed = 0
+        self.failed: List[str] = []
+        self.path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "total": len(self.courses),
+            "completed": self.completed,
+            "failed": self.failed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class ExportJobManager:
+    """Renders many grade PDFs on a process pool and writes them into a ZIP on disk.
+
+    At most `max_in_flight` courses are fetched or rendering at any time and each
+    PDF is written to the archive as soon as it is ready, so memory use does not
+    grow with the number of courses in the job.
+
+    A job ends `done` when every course was exported, `partial` when some
+    failed (the ZIP holds the others and `failed` lists the rest) and
+    `failed` when none could be exported.
+
+    Up to `max_jobs` jobs are remembered; beyond that the oldest finished ones
+    are forgotten and their files deleted. Pending or running jobs are never
+    evicted, so submit() raises ExportQueueFull when all `max_jobs` are still
+    unfinished. Job state lives in this process only: with several server
+    workers, a status poll or download routed to another worker gets a 404.
+    """
+
+    def __init__(self, db, max_workers: int, max_in_flight: int, max_jobs: int, directory: Optional[str] = None,
+                 on_render: Optional[Callable[[float], None]] = None):
+        self.db = db
+        self.on_render = on_render
+        self.max_workers = max_workers
+        self.max_in_flight = max_in_flight
+        self.max_jobs = max_jobs
+        self.directory = directory or tempfile.gettempdir()
+        self.jobs: "OrderedDict[str, ExportJob]" = OrderedDict()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._tasks = set()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def submit(self, teacher_id: str, courses: List[dict]) -> ExportJob:
+        finished = [job for job in self.jobs.values() if job.finished_at is not None]
+        if len(self.jobs) - len(finished) >= self.max_jobs:
+            raise ExportQueueFull()
+        for expired in finished[:max(0, len(self.jobs) + 1 - self.max_jobs)]:
+            del self.jobs[expired.id]
+            self._discard(expired)
+        job = ExportJob(teacher_id, courses)
+        self.jobs[job.id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        return self.jobs.get(job_id)
+
+    async def _render(self, course: dict):
+        grades = await self.db.table("grades").select("*").eq("course_id", course["id"]).execute()
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            pdf, seconds = await loop.run_in_executor(executor, render_grades_pdf_timed, course, grades.data)
+        except BrokenProcessPool:
+            # A worker died (killed, out of memory) and the pool refuses all
+            # further work; the next render starts a fresh one
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        if self.on_render is not None:
+            self.on_render(seconds)
+        return pdf
+
+    async def _run(self, job: ExportJob):
+        job.status = "running"
+        job.path = os.path.join(self.directory, f"export_{job.id}.zip")
+        loop = asyncio.get_running_loop()
+        try:
+            with zipfile.ZipFile(job.path, "w", compression=zipfile.ZIP_STORED) as archive:
+                remaining = iter(job.courses)
+                in_flight = {}
+                for course in remaining:
+                    in_flight[asyncio.ensure_future(self._render(course))] = course
+                    if len(in_flight) >= self.max_in_flight:
+                        break
+                while in_flight:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        course = in_flight.pop(future)
+                        try:
+                            pdf = future.result()
+                        except Exception:
+                            logger.exception("PDF export failed for course %s", course["id"])
+                            job.failed.append(course["id"])
+                        else:
+                            await loop.run_in_executor(None, archive.writestr, f"calificaciones_{course['code']}.pdf", pdf)
+                            job.completed += 1
+                        next_course = next(remaining, None)
+                        if next_course is not None:
+                            in_flight[asyncio.ensure_future(self._render(next_course))] = next_course
+            if job.failed and not job.completed:
+                job.status = "failed"
+                job.error = "No se pudo exportar ningún curso"
+            else:
+                job.status = "partial" if job.failed else "done"
+        except Exception as e:
+            logger.exception("Export job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now(timezone.utc).isoformat()
+
+    def _discard(self, job: ExportJob):
+        if job.path and os.path.exists(job.path):
+            os.remove(job.path)
+
+    def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        for job in self.jobs.values():
+            self._discard(job)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
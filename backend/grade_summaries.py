@@ -0,0 +1,39 @@
+"""Rebuilds the per-course grade summaries from the grades table.
+
+    cd backend && python grade_summaries.py --check
+    cd backend && python grade_summaries.py [--course COURSE_ID]
+
+The summaries are maintained by triggers on every grade write; this
+recomputes them from scratch and reports the courses whose stored totals had
+drifted. --check only reports, and exits with status 1 when drift is found.
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+
+async def rebuild(course_id, apply: bool) -> list:
+    from server import db
+
+    try:
+        result = await db.rpc("rebuild_course_grade_summaries", {"p_course_id": course_id, "p_apply": apply}).execute()
+    finally:
+        await db.aclose()
+    return result.data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--course", help="only this course id")
+    parser.add_argument("--check", action="store_true", help="report drift without rewriting the summaries")
+    args = parser.parse_args()
+
+    drift = asyncio.run(rebuild(args.course, apply=not args.check))
+    print(json.dumps({"drifted": len(drift), "courses": drift}, indent=2, default=str))
+    if args.check and drift:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
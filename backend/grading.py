@@ -0,0 +1,313 @@
+import math
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+CORTE_COLUMNS = ("corte1", "corte2", "corte3")
+CORTE_WEIGHTS = np.array([0.3, 0.35, 0.35])
+MIN_GRADE = 0.0
+MAX_GRADE = 5.0
+
+# A course's grading scheme maps up to one component onto each corte column.
+# Courses without one use DEFAULT_SCHEME.
+ROUNDING_MODES = ("half_up", "floor", "ceil")
+MAX_DECIMALS = 2
+DEFAULT_SCHEME = {
+    "components": [
+        {"column": column, "name": f"Corte {i + 1}", "weight": float(weight)}
+        for i, (column, weight) in enumerate(zip(CORTE_COLUMNS, CORTE_WEIGHTS))
+    ],
+    "decimals": 2,
+    "rounding": "half_up",
+}
+# absorbs binary floating point error before rounding (4.0*0.3 + 3.0*0.35 + 2.0*0.35 is 2.9499999...)
+ROUNDING_EPSILON = 1e-9
+
+
+def cortes_matrix(rows) -> np.ndarray:
+    """(n, 3) float matrix of corte1..corte3 with NaN for missing values."""
+    # dtype=float turns None into NaN
+    return np.array(
+        [[row.get(c) for c in CORTE_COLUMNS] for row in rows],
+        dtype=float,
+    ).reshape(-1, len(CORTE_COLUMNS))
+
+
+def scheme_error(scheme: dict) -> Optional[str]:
+    """Why a grading scheme is invalid, or None when it can be used."""
+    columns = [component["column"] for component in scheme["components"]]
+    if not 1 <= len(columns) <= len(CORTE_COLUMNS):
+        return f"El esquema debe tener entre 1 y {len(CORTE_COLUMNS)} componentes"
+    if any(column not in CORTE_COLUMNS for column in columns) or len(set(columns)) != len(columns):
+        return "Cada componente debe usar un corte distinto (corte1, corte2 o corte3)"
+    weights = [component["weight"] for component in scheme["components"]]
+    if any(weight <= 0 for weight in weights) or not math.isclose(sum(weights), 1.0, abs_tol=1e-6):
+        return "Los pesos deben ser positivos y sumar 1"
+    if not 0 <= scheme.get("decimals", 2) <= MAX_DECIMALS:
+        return f"Los decimales deben estar entre 0 y {MAX_DECIMALS}"
+    if scheme.get("rounding", "half_up") not in ROUNDING_MODES:
+        return "Modo de redondeo inválido"
+    return None
+
+
+def corte_labels(scheme: Optional[dict]) -> List[str]:
+    """Column headers for corte1..corte3, e.g. "Corte 1 (30%)"; unweighted cortes keep a plain label."""
+    components = {component["column"]: component for component in (scheme or DEFAULT_SCHEME)["components"]}
+    labels = []
+    for i, column in enumerate(CORTE_COLUMNS):
+        component = components.get(column)
+        labels.append(f"{component['name']} ({component['weight'] * 100:g}%)" if component else f"Corte {i + 1}")
+    return labels
+
+
+def scheme_arrays(schemes: Sequence[Optional[dict]]):
+    """(k, 3) weights, (k, 3) used-column mask, (k,) decimals and (k,) rounding mode codes."""
+    schemes = [scheme or DEFAULT_SCHEME for scheme in schemes]
+    weights = np.zeros((len(schemes), len(CORTE_COLUMNS)))
+    for i, scheme in enumerate(schemes):
+        for component in scheme["components"]:
+            weights[i, CORTE_COLUMNS.index(component["column"])] = component["weight"]
+    decimals = np.array([scheme.get("decimals", 2) for scheme in schemes], dtype=float)
+    modes = np.array([ROUNDING_MODES.index(scheme.get("rounding", "half_up")) for scheme in schemes])
+    return weights, weights > 0, decimals, modes
+
+
+def final_grades(cortes: np.ndarray, schemes: Sequence[Optional[dict]] = (None,), scheme_index=None) -> np.ndarray:
+    """Weighted final grade per row under its course's scheme; NaN where a weighted corte is missing.
+
+    `scheme_index` gives, per row, the position of its scheme in `schemes`;
+    by default every row uses the first one. All rows are computed in one
+    pass however many different schemes they span.
+    """
+    weights, used, decimals, modes = scheme_arrays(schemes)
+    index = np.zeros(len(cortes), dtype=np.int64) if scheme_index is None else np.asarray(scheme_index, dtype=np.int64)
+    row_weights, row_used = weights[index], used[index]
+    raw = (np.nan_to_num(cortes) * row_weights).sum(axis=1)
+    raw[(np.isnan(cortes) & row_used).any(axis=1)] = np.nan
+    return round_grades(raw, decimals[index], modes[index])
+
+
+def round_grades(raw: np.ndarray, decimals: np.ndarray, modes: np.ndarray) -> np.ndarray:
+    """Applies per-row decimals and rounding mode codes (indexes into ROUNDING_MODES)."""
+    scale = 10.0 ** decimals
+    scaled = raw * scale
+    rounded = np.choose(modes, [
+        np.floor(scaled + 0.5 + ROUNDING_EPSILON),
+        np.floor(scaled + ROUNDING_EPSILON),
+        np.ceil(scaled - ROUNDING_EPSILON),
+    ])
+    return np.round(rounded / scale, MAX_DECIMALS)
+
+
+def recomputed_finals(rows, schemes: Sequence[Optional[dict]], scheme_index) -> List[tuple]:
+    """(id, final_grade) for the rows whose stored final grade differs from the one their scheme gives."""
+    finals = final_grades(cortes_matrix(rows), schemes, scheme_index)
+    current = np.array([np.nan if row.get("final_grade") is None else row["final_grade"] for row in rows], dtype=float)
+    changed = ~(np.isclose(finals, current) | (np.isnan(finals) & np.isnan(current)))
+    return [(rows[i]["id"], None if np.isnan(finals[i]) else float(finals[i])) for i in np.flatnonzero(changed)]
+
+
+STAT_COLUMNS = CORTE_COLUMNS + ("final_grade",)
+PASSING_GRADE = 3.0
+PERCENTILES = (10, 25, 75, 90)
+HISTOGRAM_EDGES = np.linspace(MIN_GRADE, MAX_GRADE, 11)
+
+
+def _value(x):
+    return None if x is None or np.isnan(x) else round(float(x), 4)
+
+
+def grade_statistics(rows, course_ids) -> dict:
+    """Per-course descriptive statistics for each corte and the final grade.
+
+    Everything is computed column-wise over the whole result set at once, so
+    the cost is one pass over the rows regardless of how many courses they span.
+    """
+    frame = pd.DataFrame(list(rows), columns=["course_id", *STAT_COLUMNS])
+    frame[list(STAT_COLUMNS)] = frame[list(STAT_COLUMNS)].astype(float)
+    course_ids = list(course_ids)
+    courses = pd.Categorical(frame["course_id"], categories=course_ids)
+    codes = courses.codes.astype(np.int64)
+    grouped = frame.groupby(courses, observed=False)
+
+    students = grouped.size().to_numpy()
+    stats = {
+        name: getattr(grouped[list(STAT_COLUMNS)], name)().to_numpy()
+        for name in ("count", "mean", "median", "min", "max")
+    }
+    stats["std"] = grouped[list(STAT_COLUMNS)].std(ddof=0).to_numpy()
+    quantiles = grouped[list(STAT_COLUMNS)].quantile([p / 100 for p in PERCENTILES]).to_numpy().reshape(len(course_ids), len(PERCENTILES), len(STAT_COLUMNS))
+    missing = np.isnan(frame[list(CORTE_COLUMNS)].to_numpy())
+    missing_counts = np.stack([np.bincount(codes, weights=missing[:, i], minlength=len(course_ids)) for i in range(len(CORTE_COLUMNS))], axis=1)
+
+    finals = frame["final_grade"].to_numpy()
+    graded = ~np.isnan(finals)
+    passed = np.bincount(codes[graded], weights=finals[graded] >= PASSING_GRADE, minlength=len(course_ids))
+    graded_count = np.bincount(codes[graded], minlength=len(course_ids))
+
+    bins = len(HISTOGRAM_EDGES) - 1
+    histograms = {}
+    for column in STAT_COLUMNS:
+        values = frame[column].to_numpy()
+        present = ~np.isnan(values)
+        bucket = np.clip(np.digitize(values[present], HISTOGRAM_EDGES) - 1, 0, bins - 1)
+        histograms[column] = np.bincount(codes[present] * bins + bucket, minlength=len(course_ids) * bins).reshape(-1, bins)
+
+    result = {}
+    for index, course_id in enumerate(course_ids):
+        columns = {}
+        for position, column in enumerate(STAT_COLUMNS):
+            columns[column] = {
+                "count": int(stats["count"][index, position]),
+                **{name: _value(stats[name][index, position]) for name in ("mean", "median", "std", "min", "max")},
+                "percentiles": {f"p{p}": _value(quantiles[index, i, position]) for i, p in enumerate(PERCENTILES)},
+                "histogram": histograms[column][index].tolist(),
+            }
+        missing_cortes = {column: int(missing_counts[index, i]) for i, column in enumerate(CORTE_COLUMNS)}
+        result[course_id] = {
+            "course_id": course_id,
+            "students": int(students[index]),
+            "pass_rate": _value(passed[index] / graded_count[index]) if graded_count[index] else None,
+            "missing_cortes": {**missing_cortes, "total": sum(missing_cortes.values())},
+            "histogram_edges": HISTOGRAM_EDGES.tolist(),
+            "columns": columns,
+        }
+    return result
+
+
+SUMMARY_FIELDS = ("students", "pending_cortes") + tuple(
+    f"{column}_{part}" for column in STAT_COLUMNS for part in ("count", "sum", "sumsq")
+)
+
+
+def empty_summary(course_id) -> dict:
+    return {"course_id": course_id, **{field: 0 for field in SUMMARY_FIELDS}}
+
+
+def accumulate_summaries(totals: dict, rows, sign: int = 1) -> dict:
+    """Adds (sign=1) or removes (sign=-1) grade rows from per-course summary totals.
+
+    Sums are rounded to 4 decimals, the scale of a squared numeric(3,2), so
+    adding and later removing the same rows leaves exactly the previous totals.
+    """
+    for row in rows:
+        summary = totals.get(row["course_id"])
+        if summary is None:
+            summary = totals[row["course_id"]] = empty_summary(row["course_id"])
+        summary["students"] += sign
+        summary["pending_cortes"] += sign * sum(row.get(column) is None for column in CORTE_COLUMNS)
+        for column in STAT_COLUMNS:
+            value = row.get(column)
+            if value is None:
+                continue
+            summary[f"{column}_count"] += sign
+            summary[f"{column}_sum"] = round(summary[f"{column}_sum"] + sign * value, 4)
+            summary[f"{column}_sumsq"] = round(summary[f"{column}_sumsq"] + sign * value * value, 4)
+    return totals
+
+
+def summary_statistics(summary: dict) -> dict:
+    """Mean, population standard deviation and completion from a course_grade_summaries row."""
+    students = int(summary.get("students") or 0)
+    pending = int(summary.get("pending_cortes") or 0)
+    columns = {}
+    for column in STAT_COLUMNS:
+        count = int(summary.get(f"{column}_count") or 0)
+        mean = std = None
+        if count:
+            mean = float(summary[f"{column}_sum"]) / count
+            std = math.sqrt(max(0.0, float(summary[f"{column}_sumsq"]) / count - mean * mean))
+        columns[column] = {"count": count, "mean": _value(mean), "std": _value(std)}
+    return {
+        "course_id": summary["course_id"],
+        "students": students,
+        "pending_cortes": pending,
+        "completion": _value(1 - pending / (students * len(CORTE_COLUMNS))) if students else None,
+        "updated_at": summary.get("updated_at"),
+        "columns": columns,
+    }
+
+
+PROJECTION_STATUSES = ("passed", "failed", "at_risk", "on_track")
+
+
+def grade_projection(cortes: np.ndarray, scheme: Optional[dict], target: float = PASSING_GRADE, risk_threshold: float = 4.0) -> dict:
+    """What-if projection for every row of one course, in one array pass.
+
+    `required` is the score needed on each ungraded component of the scheme
+    (the same on all of them) for the final grade to reach `target`, rounded
+    up to 0.1: 0 once the target is secured, above MAX_GRADE when it is out of
+    reach and NaN when nothing is left to grade. `best` and `worst` are the
+    finals with every ungraded component at MAX_GRADE or MIN_GRADE. `status`
+    indexes PROJECTION_STATUSES; a row is at risk when it can no longer pass
+    or needs at least `risk_threshold` on what is left.
+    """
+    weights, used, decimals, modes = scheme_arrays([scheme])
+    weights, used = weights[0], used[0]
+    graded = ~np.isnan(cortes) & used
+    earned = (np.nan_to_num(cortes) * weights * graded).sum(axis=1)
+    remaining = (weights * (used & ~graded)).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        required = np.where(remaining > 0, (target - earned) / remaining, np.nan)
+    required = np.maximum(np.ceil(required * 10 - ROUNDING_EPSILON) / 10, 0.0)
+
+    row_decimals = np.full(len(cortes), decimals[0])
+    row_modes = np.full(len(cortes), modes[0])
+    best = round_grades(earned + remaining * MAX_GRADE, row_decimals, row_modes)
+    worst = round_grades(earned + remaining * MIN_GRADE, row_decimals, row_modes)
+
+    status = np.select([worst >= target, best < target, required >= risk_threshold], [0, 1, 2], default=3)
+    return {"required": required, "best": best, "worst": worst, "status": status, "at_risk": (status == 1) | (status == 2)}
+
+
+def course_projection(rows, scheme: Optional[dict], risk_threshold: float = 4.0) -> dict:
+    """grade_projection over a course's grade rows, as JSON-ready per-row entries."""
+    projection = grade_projection(cortes_matrix(rows), scheme, risk_threshold=risk_threshold)
+    statuses = [PROJECTION_STATUSES[code] for code in projection["status"]]
+    entries = [{
+        "enrollment_id": row["enrollment_id"],
+        "student_id": row["student_id"],
+        "student_name": row["student_name"],
+        **{column: row.get(column) for column in STAT_COLUMNS},
+        "required": _value(projection["required"][i]),
+        "best_final": _value(projection["best"][i]),
+        "worst_final": _value(projection["worst"][i]),
+        "status": statuses[i],
+        "at_risk": bool(projection["at_risk"][i]),
+    } for i, row in enumerate(rows)]
+    return {
+        "target": PASSING_GRADE,
+        "risk_threshold": risk_threshold,
+        "students": len(rows),
+        "counts": {status: statuses.count(status) for status in PROJECTION_STATUSES},
+        "rows": entries,
+    }
+
+
+def sorted_columns(rows) -> dict:
+    """Ascending array of the recorded values of each corte and the final grade."""
+    matrix = np.array([[row.get(column) for column in STAT_COLUMNS] for row in rows], dtype=float).reshape(-1, len(STAT_COLUMNS))
+    return {column: np.sort(values[~np.isnan(values)]) for column, values in zip(STAT_COLUMNS, matrix.T)}
+
+
+def percentile_standing(columns: dict, row: dict, min_cohort: int = 1) -> dict:
+    """Percentile rank (0-100) and quartile (1-4, 4 the highest) of `row` in each column.
+
+    Values equal to the student's count half, so a grade shared by the whole
+    course ranks at 50. Each column costs two binary searches over the arrays
+    from sorted_columns; columns the student has no value in, or with fewer
+    than `min_cohort` values, are None so small groups cannot be unmasked.
+    """
+    standing = {}
+    for column in STAT_COLUMNS:
+        values, value = columns[column], row.get(column)
+        if value is None or len(values) < min_cohort:
+            standing[column] = None
+            continue
+        below = np.searchsorted(values, value, side="left")
+        equal = np.searchsorted(values, value, side="right") - below
+        percentile = (below + equal / 2) / len(values) * 100
+        standing[column] = {"percentile": round(float(percentile), 1), "quartile": min(4, int(percentile // 25) + 1)}
+    return standing
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoaderStats:
+    def __init__(self):
+        self.lookups = 0
+        self.coalesced = 0
+        self.queries = 0
+
+    def to_dict(self) -> dict:
+        return {"lookups": self.lookups, "coalesced": self.coalesced, "queries": self.queries}
+
+
+class RowLoader:
+    """Loads rows of one table by id for the duration of a request.
+
+    Lookups made in the same event-loop iteration are sent as one
+    `in_("id", ...)` query, and repeated keys are answered from the results
+    already fetched. Rows are returned as copies so callers may modify them.
+    """
+
+    def __init__(self, db, table: str, stats: LoaderStats):
+        self.db = db
+        self.table = table
+        self.stats = stats
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._tasks = set()
+
+    async def load(self, key: Hashable) -> Optional[dict]:
+        self.stats.lookups += 1
+        future = self._results.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+        else:
+            future = self._results[key] = asyncio.get_running_loop().create_future()
+            if not self._pending:
+                asyncio.get_running_loop().call_soon(self._start_dispatch)
+            else:
+                self.stats.coalesced += 1
+            self._pending[key] = future
+        row = await asyncio.shield(future)
+        return dict(row) if row is not None else None
+
+    def forget(self, key: Hashable):
+        if key not in self._pending:
+            self._results.pop(key, None)
+
+    def _start_dispatch(self):
+        # The event loop only keeps weak references to tasks; hold this one until it finishes
+        task = asyncio.ensure_future(self._dispatch())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        self.stats.queries += 1
+        try:
+            result = await self.db.table(self.table).select("*").in_("id", list(batch)).execute()
+        except Exception as e:
+            for key, future in batch.items():
+                self._results.pop(key, None)
+                future.set_exception(e)
+            return
+        rows = {row["id"]: row for row in result.data}
+        for key, future in batch.items():
+            future.set_result(rows.get(key))
+
+
+class RequestLoaders:
+    def __init__(self, db):
+        self.db = db
+        self.stats = LoaderStats()
+        self._loaders: Dict[str, RowLoader] = {}
+
+    def get(self, table: str) -> RowLoader:
+        loader = self._loaders.get(table)
+        if loader is None:
+            loader = self._loaders[table] = RowLoader(self.db, table, self.stats)
+        return loader
+
+
+_current: ContextVar[Optional[RequestLoaders]] = ContextVar("request_loaders", default=None)
+
+
+async def load_row(db, table: str, key: Hashable) -> Optional[dict]:
+    """Row of `table` with the given id; batched and memoized inside a request."""
+    loaders = _current.get()
+    if loaders is None:
+        result = await db.table(table).select("*").eq("id", key).execute()
+        return result.data[0] if result.data else None
+    return await loaders.get(table).load(key)
+
+
+def forget_row(table: str, key: Hashable):
+    """Drops a memoized row after the request itself has written it."""
+    loaders = _current.get()
+    if loaders is not None:
+        loaders.get(table).forget(key)
+
+
+class RequestLoaderMiddleware:
+    """ASGI middleware giving each HTTP request a fresh set of loaders."""
+
+    def __init__(self, app, db):
+        self.app = app
+        self.db = db
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        loaders = RequestLoaders(self.db)
+        token = _current.set(loaders)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            if loaders.stats.lookups:
+                logger.debug("%s %s row loads: %s", scope["method"], scope["path"], loaders.stats.to_dict())
@@ -0,0 +1,120 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a fixed tuple of label values."""
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # per-bucket counts (last slot is +Inf), then sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _format_bound(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, label_values)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, label_values)} {cumulative}")
+        return "\n".join(lines)
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route", "status"))
+REQUEST_ROUND_TRIPS = Histogram("http_request_db_round_trips", "Database round trips made while serving one request.", ("method", "route"), COUNT_BUCKETS)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Database call latency by table (or function) and operation.", ("table", "operation"))
+BCRYPT_SECONDS = Histogram("bcrypt_duration_seconds", "Time spent inside bcrypt, excluding queueing.", ("operation",))
+PDF_RENDER_SECONDS = Histogram("pdf_render_duration_seconds", "Time spent rendering grade PDFs with ReportLab.", ("source",))
+
+REGISTRY = (REQUEST_SECONDS, REQUEST_ROUND_TRIPS, DB_QUERY_SECONDS, BCRYPT_SECONDS, PDF_RENDER_SECONDS)
+
+_round_trips: ContextVar[Optional[list]] = ContextVar("db_round_trips", default=None)
+
+
+def record_query(table: str, operation: str, seconds: float):
+    DB_QUERY_SECONDS.observe(seconds, table, operation)
+    counter = _round_trips.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+def render() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+class MetricsMiddleware:
+    """Records latency and database round trips per route template.
+
+    The route template comes from scope["route"], which FastAPI sets once the
+    request is matched, so path parameters do not explode label cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        round_trips = [0]
+        token = _round_trips.set(round_trips)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _round_trips.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(elapsed, scope["method"], template, str(status[0]))
+            REQUEST_ROUND_TRIPS.observe(round_trips[0], scope["method"], template)
@@ -0,0 +1,246 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+STOP = object()
+
+
+class NotificationQueue:
+    """Write-behind buffer for notification rows.
+
+    Rows are coalesced into one multi-row insert every `flush_interval` seconds
+    or as soon as `max_batch` rows are waiting. put() blocks once `max_size`
+    rows are buffered, which pushes back on producers instead of growing
+    without bound.
+    """
+
+    def __init__(self, db, max_batch: int, flush_interval: float, max_size: int, on_flush: Optional[Callable[[List[dict]], None]] = None):
+        self.db = db
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_size = max_size
+        self.enqueued = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, row: dict):
+        self.start()
+        await self._queue.put(row)
+        self.enqueued += 1
+
+    async def stop(self):
+        if self._task is None or self._task.done():
+            return
+        await self._queue.put(STOP)
+        await self._task
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is STOP:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.max_batch:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            if item is STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+
+    async def _flush(self, batch: List[dict]):
+        start = time.perf_counter()
+        try:
+            await self.db.table("notifications").insert(batch).execute()
+        except Exception:
+            self.failed += len(batch)
+            logger.exception("Failed to flush %d notifications", len(batch))
+            return
+        elapsed = time.perf_counter() - start
+        self.flushed += len(batch)
+        self.flushes += 1
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        self.total_flush_seconds += elapsed
+        if self.on_flush is not None:
+            self.on_flush(batch)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_size": self.max_size,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "failed": self.failed,
+            "flushes": self.flushes,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 3),
+            "max_flush_ms": round(self.max_flush_seconds * 1000, 3),
+            "avg_flush_ms": round(self.total_flush_seconds / self.flushes * 1000, 3) if self.flushes else 0.0,
+        }
+
+
+class Subscription:
+    def __init__(self, user_id: str, max_pending: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def deliver(self, event: tuple):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class History:
+    """A user's most recent events; ids up to `floor` may have been dropped."""
+
+    def __init__(self, size: int, floor: int):
+        self.events = deque(maxlen=size)
+        self.floor = floor
+
+    def append(self, event: tuple):
+        if len(self.events) == self.events.maxlen:
+            self.floor = self.events[0][0]
+        self.events.append(event)
+
+
+class NotificationHub:
+    """In-process pub/sub for persisted notifications.
+
+    Every published notification gets a monotonically increasing event id and
+    is kept in a short per-user history so reconnecting clients can resume
+    from their last event id. Ids are only meaningful within this process;
+    replay() returns None when a resume cannot be served and the client must
+    reload the full list instead. That covers events rotated out of a user's
+    history and whole histories dropped when more than `max_users` users have
+    one: once any history was dropped, a new one cannot tell whether that user
+    had earlier events, so it only vouches for events from its creation on.
+    """
+
+    def __init__(self, history_size: int, max_users: int, max_pending: int):
+        self.history_size = history_size
+        self.max_pending = max_pending
+        self.published = 0
+        self._ids = itertools.count(1)
+        self._history = TTLCache(max_size=max_users)
+        self._subscribers = {}
+
+    def publish(self, rows: List[dict]):
+        for row in rows:
+            event = (next(self._ids), row)
+            history = self._history.get(row["user_id"])
+            if history is None:
+                history = History(self.history_size, floor=self.published if self._history.evictions else 0)
+                self._history.set(row["user_id"], history)
+            self.published = event[0]
+            history.append(event)
+            for subscription in self._subscribers.get(row["user_id"], ()):
+                subscription.deliver(event)
+
+    def replay(self, user_id: str, last_event_id: int) -> Optional[List[tuple]]:
+        if last_event_id > self.published:
+            return None
+        history = self._history.get(user_id)
+        if history is None:
+            # Either the user had no events or their history was evicted
+            return None if self._history.evictions and last_event_id < self.published else []
+        if last_event_id < history.floor:
+            return None
+        return [event for event in history.events if event[0] > last_event_id]
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, self.max_pending)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def stats(self) -> dict:
+        return {
+            "published": self.published,
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "users_connected": len(self._subscribers),
+        }
+
+
+class UnreadCounter:
+    """Per-user unread notification counts, adjusted as notifications are
+    written and read instead of recounted on every request.
+
+    A user's count is seeded by one COUNT query on first use and then kept
+    current by add(); entries expire after `ttl` seconds, which bounds drift
+    from writes made by other processes.
+    """
+
+    def __init__(self, db, max_users: int, ttl: float):
+        self.db = db
+        self._counts = TTLCache(max_size=max_users, ttl=ttl)
+
+    async def get(self, user_id: str) -> int:
+        count = self._counts.get(user_id)
+        if count is None:
+            result = await self.db.table("notifications").select("id", count="exact").eq("user_id", user_id).eq("read", False).limit(1).execute()
+            count = result.count or 0
+            self._counts.set(user_id, count)
+        return count
+
+    def add(self, user_id: str, delta: int):
+        count = self._counts.get(user_id)
+        if count is not None:
+            self._counts.set(user_id, max(count + delta, 0))
+
+    def invalidate(self, user_id: str):
+        self._counts.invalidate(user_id)
+
+    def notifications_flushed(self, rows: List[dict]):
+        for row in rows:
+            if not row.get("read"):
+                self.add(row["user_id"], 1)
+
+    def stats(self) -> dict:
+        return self._counts.stats()
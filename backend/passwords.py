@@ -0,0 +1,56 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from passlib.context import CryptContext
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on a bounded thread pool.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    Once `max_pending` calls are queued or running, new calls fail fast with
+    HasherBusy instead of piling up behind the pool.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_pending: int, on_timing: Optional[Callable[[str, float], None]] = None):
+        self.context = context
+        # called from the worker thread with (operation, seconds spent in bcrypt)
+        self.on_timing = on_timing
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+
+    def _timed(self, operation: str, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            if self.on_timing is not None:
+                self.on_timing(operation, time.perf_counter() - start)
+
+    async def _run(self, operation: str, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self._timed, operation, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Returns (valid, new_hash); new_hash is set when the stored hash uses outdated settings."""
+        return await self._run("verify", self.context.verify_and_update, password, hashed)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,65 @@
+import os
+
+# The API module picks its backend at import time; tests never touch Supabase
+os.environ["DATA_BACKEND"] = "memory"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database import create_database
+
+
+@pytest.fixture
+def db():
+    return create_database("memory")
+
+
+@pytest.fixture(scope="session")
+def client():
+    import server
+
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """Registers a user with a unique email and returns (user, auth headers)."""
+    def register_user(role: str, full_name: str = None):
+        email = f"{role}-{uuid.uuid4().hex[:12]}@example.com"
+        response = client.post("/api/auth/register", json={
+            "full_name": full_name or email.split("@")[0], "email": email, "password": "secret", "role": role,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body["user"], {"Authorization": f"Bearer {body['access_token']}"}
+    return register_user
+
+
+@pytest.fixture
+def teacher(register):
+    return register("teacher")
+
+
+@pytest.fixture
+def course(client, teacher):
+    _, headers = teacher
+    response = client.post("/api/courses", headers=headers, json={
+        "name": "Programación Avanzada", "code": f"PA-{uuid.uuid4().hex[:8]}", "description": "Curso", "academic_period": "2025-1",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def enroll(client, register, course):
+    """Enrolls a new student in `course` and returns (user, auth headers)."""
+    def enroll_student(full_name: str = None):
+        user, headers = register("student", full_name)
+        response = client.post("/api/courses/enroll", headers=headers, json={"access_code": course["access_code"]})
+        assert response.status_code == 200, response.text
+        return user, headers
+    return enroll_student
@@ -0,0 +1,298 @@
+import pytest
+from passlib.context import CryptContext
+
+from database import upsert_grade
+
+SCHEME = {
+    "components": [{"column": "corte1", "name": "Parcial", "weight": 0.4}, {"column": "corte3", "name": "Final", "weight": 0.6}],
+    "decimals": 1,
+    "rounding": "floor",
+}
+
+
+@pytest.fixture
+def server():
+    import server
+    return server
+
+
+def course_grades(client, course, headers):
+    response = client.get(f"/api/grades/course/{course['id']}", headers=headers)
+    assert response.status_code == 200, response.text
+    return {grade["student_id"]: grade for grade in response.json()}
+
+
+def test_grade_save_with_stale_version_is_a_conflict(client, teacher, course, enroll):
+    _, headers = teacher
+    student, _ = enroll()
+    grade = course_grades(client, course, headers)[student["id"]]
+
+    saved = client.post("/api/grades", headers=headers, json={
+        "enrollment_id": grade["enrollment_id"], "corte1": 4.0, "expected_last_updated": grade["last_updated"],
+    })
+    assert saved.status_code == 200, saved.text
+    stale = client.post("/api/grades", headers=headers, json={
+        "enrollment_id": grade["enrollment_id"], "corte1": 1.0, "expected_last_updated": grade["last_updated"],
+    })
+    assert stale.status_code == 409
+    assert course_grades(client, course, headers)[student["id"]]["corte1"] == 4.0
+
+
+def test_bulk_save_reports_each_row(client, teacher, course, enroll):
+    _, headers = teacher
+    (first, _), (second, _) = enroll(), enroll()
+    grades = course_grades(client, course, headers)
+    client.post("/api/grades", headers=headers, json={"enrollment_id": grades[first["id"]]["enrollment_id"], "corte1": 5.0})
+
+    response = client.post("/api/grades/bulk", headers=headers, json={"course_id": course["id"], "grades": [
+        {"enrollment_id": grades[first["id"]]["enrollment_id"], "corte2": 3.0, "corte3": 2.0},
+        {"enrollment_id": grades[second["id"]]["enrollment_id"], "corte1": 2.0, "expected_last_updated": "2000-01-01T00:00:00+00:00"},
+        {"enrollment_id": grades[second["id"]]["enrollment_id"], "corte1": "no es un número"},
+        {"enrollment_id": "not-an-id", "corte1": 3.0},
+        {"enrollment_id": grades[first["id"]]["enrollment_id"], "corte1": 6.0},
+    ]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["ok", "conflict", "error", "error", "error"]
+    assert [result.get("detail") for result in body["results"][2:]] == [
+        "Fila inválida", "Inscripción no encontrada", "Inscripción duplicada en el lote",
+    ]
+    assert (body["saved"], body["failed"]) == (1, 4)
+    # corte1 was not sent, so the value saved earlier is merged in
+    assert body["results"][0]["grade"]["corte1"] == 5.0
+    assert body["results"][0]["grade"]["final_grade"] == 3.25
+
+
+def test_bulk_save_rejects_other_teachers(client, register, course, enroll):
+    _, headers = register("teacher")
+    enroll()
+    response = client.post("/api/grades/bulk", headers=headers, json={"course_id": course["id"], "grades": []})
+    assert response.status_code == 404
+
+
+def test_grading_scheme_recomputes_and_labels_exports(client, teacher, course, enroll):
+    _, headers = teacher
+    student, _ = enroll()
+    enrollment_id = course_grades(client, course, headers)[student["id"]]["enrollment_id"]
+    client.post("/api/grades", headers=headers, json={"enrollment_id": enrollment_id, "corte1": 3.1, "corte2": 1.0, "corte3": 2.6})
+
+    response = client.put(f"/api/courses/{course['id']}/grading-scheme", headers=headers, json=SCHEME)
+    assert response.status_code == 200, response.text
+    assert response.json()["recomputed"] == 1
+    assert course_grades(client, course, headers)[student["id"]]["final_grade"] == 2.8
+
+    export = client.get(f"/api/grades/export/{course['id']}", headers=headers, params={"format": "csv"})
+    assert export.text.lstrip("﻿").splitlines()[0] == "Curso,Estudiante,Parcial (40%),Corte 2,Final (60%),Nota Final"
+
+    invalid = client.put(f"/api/courses/{course['id']}/grading-scheme", headers=headers, json={**SCHEME, "decimals": 5})
+    assert invalid.status_code == 400
+
+
+def test_recompute_does_not_overwrite_a_save_made_meanwhile(client, server, teacher, course, enroll, monkeypatch):
+    user, headers = teacher
+    student, _ = enroll()
+    enrollment_id = course_grades(client, course, headers)[student["id"]]["enrollment_id"]
+    client.post("/api/grades", headers=headers, json={"enrollment_id": enrollment_id, "corte1": 3.1, "corte2": 1.0, "corte3": 2.6})
+
+    recomputed_finals = server.recomputed_finals
+    passes = []
+
+    def save_between_read_and_write(rows, schemes, scheme_index):
+        changed = recomputed_finals(rows, schemes, scheme_index)
+        if not passes:
+            # Another session saves corte3 after the recompute read the row
+            upsert_grade(server.db.backend, p_teacher_id=user["id"], p_enrollment_id=enrollment_id, p_corte3=5.0)
+        passes.append(changed)
+        return changed
+
+    monkeypatch.setattr(server, "recomputed_finals", save_between_read_and_write)
+    response = client.put(f"/api/courses/{course['id']}/grading-scheme", headers=headers, json=SCHEME)
+    assert response.status_code == 200, response.text
+    # The stale write computed from corte3 = 2.6 was skipped; the save already used the new scheme
+    assert (len(passes), passes[1], response.json()["recomputed"]) == (2, [], 0)
+    assert course_grades(client, course, headers)[student["id"]]["final_grade"] == 4.2
+
+
+def test_roster_cursor_pages_cover_the_course(client, server, teacher, course, enroll, monkeypatch):
+    _, headers = teacher
+    students = {enroll(name)[0]["id"] for name in ("Ana", "Beto", "Carla", "Dario", "Elena")}
+
+    seen, cursor = [], None
+    while True:
+        response = client.get(f"/api/courses/{course['id']}/roster", headers=headers, params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        assert response.headers["X-Total-Count"] == "5"
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert [row["student_name"] for row in seen] == ["Ana", "Beto", "Carla", "Dario", "Elena"]
+    assert {row["student_id"] for row in seen} == students
+    assert client.get(f"/api/courses/{course['id']}/roster", headers=headers, params={"cursor": "nope"}).status_code == 400
+
+
+def test_roster_cursor_only_continues_its_own_sort(client, server, teacher, course, enroll):
+    _, headers = teacher
+    for name in ("Ana", "Beto", "Carla"):
+        enroll(name)
+    first = client.get(f"/api/courses/{course['id']}/roster", headers=headers, params={"limit": 2})
+    cursor = first.headers["X-Next-Cursor"]
+    roster = f"/api/courses/{course['id']}/roster"
+
+    assert client.get(roster, headers=headers, params={"cursor": cursor}).status_code == 200
+    assert client.get(roster, headers=headers, params={"cursor": cursor, "sort": "corte1"}).status_code == 400
+    assert client.get(roster, headers=headers, params={"cursor": cursor, "order": "desc"}).status_code == 400
+    # A hand-made cursor whose key does not fit the sort column is rejected too
+    forged = server.encode_cursor("Beto", first.json()[-1]["enrollment_id"], "corte1", "asc")
+    assert client.get(roster, headers=headers, params={"cursor": forged, "sort": "corte1"}).status_code == 400
+
+
+def test_notifications_cursor_pages(client, server, register):
+    user, headers = register("student")
+    stamps = ["2025-01-01T00:00:00+00:00"] * 3 + ["2025-01-02T00:00:00+00:00"] * 2
+    backend = server.db.backend
+    backend.insert_rows("notifications", [
+        backend.new_row("notifications", {"user_id": user["id"], "message": str(i), "type": "grade_update", "created_at": stamp})
+        for i, stamp in enumerate(stamps)
+    ])
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/notifications", headers=headers, params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert len({row["id"] for row in seen}) == 5
+    assert [row["created_at"][:10] for row in seen] == ["2025-01-02"] * 2 + ["2025-01-01"] * 3
+
+
+def test_pdf_export_etag(client, teacher, course, enroll):
+    _, headers = teacher
+    student, _ = enroll()
+    first = client.get(f"/api/grades/export/{course['id']}", headers=headers)
+    assert first.status_code == 200 and first.content[:4] == b"%PDF"
+    etag = first.headers["ETag"]
+
+    cached = client.get(f"/api/grades/export/{course['id']}", headers={**headers, "If-None-Match": f"W/{etag}"})
+    assert cached.status_code == 304
+
+    enrollment_id = course_grades(client, course, headers)[student["id"]]["enrollment_id"]
+    client.post("/api/grades", headers=headers, json={"enrollment_id": enrollment_id, "corte1": 4.0})
+    changed = client.get(f"/api/grades/export/{course['id']}", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+
+def test_student_overview_etag(client, enroll):
+    _, headers = enroll()
+    first = client.get("/api/students/me/overview", headers=headers)
+    assert first.status_code == 200 and len(first.json()["courses"]) == 1
+    assert client.get("/api/students/me/overview", headers={**headers, "If-None-Match": first.headers["ETag"]}).status_code == 304
+
+
+def test_projection_and_standing(client, server, teacher, course, enroll, monkeypatch):
+    monkeypatch.setattr(server, "RANK_MIN_COHORT", 2)
+    _, headers = teacher
+    (weak, weak_headers), (strong, strong_headers) = enroll(), enroll()
+    grades = course_grades(client, course, headers)
+    client.post("/api/grades", headers=headers, json={"enrollment_id": grades[weak["id"]]["enrollment_id"], "corte1": 1.0, "corte2": 1.0})
+    client.post("/api/grades", headers=headers, json={"enrollment_id": grades[strong["id"]]["enrollment_id"], "corte1": 5.0, "corte2": 5.0})
+
+    projection = client.get(f"/api/grades/course/{course['id']}/projection", headers=headers).json()
+    assert projection["counts"] == {"passed": 1, "failed": 1, "at_risk": 0, "on_track": 0}
+    own = client.get(f"/api/grades/student/course/{course['id']}/projection", headers=weak_headers).json()
+    assert (own["student_id"], own["status"], own["at_risk"]) == (weak["id"], "failed", True)
+    assert client.get(f"/api/grades/course/{course['id']}/projection", headers=weak_headers).status_code == 403
+
+    standing = client.get(f"/api/grades/student/course/{course['id']}", headers=strong_headers).json()["standing"]
+    assert standing["corte1"] == {"percentile": 75.0, "quartile": 4}
+    assert standing["corte3"] is None
+
+
+@pytest.mark.parametrize("path", ["/api/metrics", "/api/cache/stats", "/api/notifications/queue-stats"])
+def test_operational_endpoints_need_a_teacher_or_the_metrics_token(client, server, register, path, monkeypatch):
+    _, student_headers = register("student")
+    _, teacher_headers = register("teacher")
+    assert client.get(path, headers=student_headers).status_code == 403
+    assert client.get(path, headers=teacher_headers).status_code == 200
+    assert client.get(path).status_code == 401
+
+    monkeypatch.setattr(server, "METRICS_TOKEN", "scraper-token")
+    assert client.get(path, headers={"Authorization": "Bearer scraper-token"}).status_code == 200
+
+
+def test_authenticated_users_come_from_the_cache(client, server, register, monkeypatch):
+    user, headers = register("student")
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    tables = []
+    record_query = server.db.on_query
+    monkeypatch.setattr(server.db, "on_query", lambda table, operation, seconds: (tables.append(table), record_query(table, operation, seconds)))
+
+    assert client.get("/api/auth/me", headers=headers).json()["id"] == user["id"]
+    assert "users" not in tables
+    server.forget_user(user["id"])
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert "users" in tables
+
+
+def test_busy_password_hasher_answers_503(client, server, monkeypatch):
+    monkeypatch.setattr(server.password_hasher, "max_pending", 0)
+    response = client.post("/api/auth/register", json={"full_name": "x", "email": "busy@example.com", "password": "secret", "role": "student"})
+    assert (response.status_code, response.json()["detail"]) == (503, "Servidor ocupado, intenta de nuevo")
+
+
+def test_login_rehashes_outdated_password_hashes(client, server, register):
+    user, _ = register("student")
+    stored = server.db.backend.find("users", id=user["id"])[0]
+    stored["password_hash"] = CryptContext(schemes=["bcrypt"], bcrypt__rounds=server.BCRYPT_ROUNDS + 1).hash("secret")
+
+    response = client.post("/api/auth/login", json={"email": user["email"], "password": "secret"})
+    assert response.status_code == 200, response.text
+    assert not server.pwd_context.needs_update(stored["password_hash"])
+    assert client.post("/api/auth/login", json={"email": user["email"], "password": "secret"}).status_code == 200
+
+
+def test_grade_stats_endpoints(client, teacher, course, enroll):
+    _, headers = teacher
+    (first, _), (second, _) = enroll(), enroll()
+    grades = course_grades(client, course, headers)
+    for student, cortes in ((first, (4.0, 3.0, 2.0)), (second, (1.0, 1.0, 1.0))):
+        client.post("/api/grades", headers=headers, json={"enrollment_id": grades[student["id"]]["enrollment_id"], **dict(zip(("corte1", "corte2", "corte3"), cortes))})
+
+    stats = client.get(f"/api/grades/course/{course['id']}/stats", headers=headers).json()
+    assert (stats["students"], stats["pass_rate"], stats["columns"]["final_grade"]["mean"]) == (2, 0.0, 1.975)
+
+    period = client.get("/api/grades/stats", headers=headers, params={"academic_period": course["academic_period"]}).json()
+    assert [(entry["code"], entry["students"]) for entry in period["courses"]] == [(course["code"], 2)]
+    assert period["courses"][0]["columns"] == stats["columns"]
+
+
+def test_grade_delta_sync(client, server, teacher, course, enroll):
+    _, headers = teacher
+    (first, _), (second, _) = enroll(), enroll()
+    path = f"/api/grades/course/{course['id']}"
+    for grade in server.db.backend.find("grades", course_id=course["id"]):
+        grade["last_updated"] = "2025-01-01T00:00:00+00:00" if grade["student_id"] == first["id"] else "2025-01-02T00:00:00+00:00"
+
+    full = client.get(path, headers=headers)
+    cursor = full.headers["X-Sync-Cursor"]
+    assert len(full.json()) == 2
+
+    # Nothing new: only the newest row, inside the overlap window, is sent again
+    unchanged = client.get(path, headers=headers, params={"since": cursor})
+    assert [grade["student_id"] for grade in unchanged.json()] == [second["id"]]
+    assert unchanged.headers["X-Sync-Cursor"] == cursor
+
+    enrollment_id = {grade["student_id"]: grade["enrollment_id"] for grade in full.json()}[first["id"]]
+    client.post("/api/grades", headers=headers, json={"enrollment_id": enrollment_id, "corte1": 4.5})
+    changed = client.get(path, headers=headers, params={"since": cursor})
+    assert {grade["student_id"]: grade["corte1"] for grade in changed.json()} == {first["id"]: 4.5, second["id"]: None}
+    assert changed.headers["X-Sync-Cursor"] != cursor
+
+    # Plain timestamps work too
+    plain = client.get(path, headers=headers, params={"since": "2025-01-02T00:00:06+00:00"})
+    assert [grade["student_id"] for grade in plain.json()] == [first["id"]]
+    assert client.get(path, headers=headers, params={"since": "yesterday"}).status_code == 400
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from cache import TTLCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, 1, 3)
+    assert cache.stats() == {"size": 2, "max_size": 2, "hits": 3, "misses": 1, "evictions": 1}
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a", "expired") == "expired"
+    assert len(cache) == 0
+
+
+def test_byte_budget_evicts_and_skips_oversized_values():
+    cache = TTLCache(max_size=10, max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"5678")
+    cache.set("c", b"90ab")
+    assert (cache.get("a"), cache.bytes) == (None, 8)
+    cache.set("huge", b"x" * 11)
+    assert cache.get("huge") is None and cache.bytes == 8
+    cache.invalidate("b")
+    assert cache.stats()["bytes"] == 4
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(max_size=10)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return "course"
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_load("code", load) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["course"] * 5
+    assert len(loads) == 1 and cache.get("code") == "course"
+
+
+def test_missing_rows_are_not_cached():
+    cache = TTLCache(max_size=10)
+    loads = []
+
+    async def load():
+        loads.append(1)
+
+    async def run():
+        await cache.get_or_load("code", load)
+        await cache.get_or_load("code", load)
+
+    asyncio.run(run())
+    assert len(loads) == 2 and len(cache) == 0
+
+
+def test_invalidate_during_a_load_discards_its_result():
+    cache = TTLCache(max_size=10)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def stale_load():
+        started.set()
+        await release.wait()
+        return "stale"
+
+    async def fresh_load():
+        return "fresh"
+
+    async def run():
+        waiting = asyncio.ensure_future(cache.get_or_load("code", stale_load))
+        await started.wait()
+        cache.invalidate("code")
+        fresh = await cache.get_or_load("code", fresh_load)
+        release.set()
+        return await waiting, fresh
+
+    assert asyncio.run(run()) == ("stale", "fresh")
+    assert cache.get("code") == "fresh"
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import zipfile
+
+import pytest
+
+import exports
+from exports import ExportJobManager, ExportQueueFull
+from reports import render_grades_pdf_timed
+
+
+def course(code):
+    return {"id": f"course-{code}", "name": code, "code": code, "academic_period": "2025-1"}
+
+
+def render_or_crash(course, grades):
+    # Runs in a pool worker; exiting takes the whole pool down, like an OOM kill
+    if course["code"] == "BOOM":
+        os._exit(1)
+    return render_grades_pdf_timed(course, grades)
+
+
+async def finished(job):
+    while job.finished_at is None:
+        await asyncio.sleep(0.01)
+    return job
+
+
+def test_a_dead_worker_fails_its_courses_and_the_next_ones_get_a_new_pool(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(exports, "render_grades_pdf_timed", render_or_crash)
+    manager = ExportJobManager(db, max_workers=1, max_in_flight=1, max_jobs=5, directory=str(tmp_path))
+
+    async def run():
+        partial = await finished(manager.submit("teacher", [course("A"), course("BOOM"), course("C")]))
+        failed = await finished(manager.submit("teacher", [course("BOOM")]))
+        return partial, failed
+
+    try:
+        partial, failed = asyncio.run(run())
+    finally:
+        manager.shutdown()
+    assert (partial.status, partial.completed, partial.failed) == ("partial", 2, ["course-BOOM"])
+    assert (failed.status, failed.completed, failed.failed) == ("failed", 0, ["course-BOOM"])
+
+
+def test_jobs_write_one_pdf_per_course(db, tmp_path):
+    manager = ExportJobManager(db, max_workers=1, max_in_flight=2, max_jobs=5, directory=str(tmp_path))
+
+    async def run():
+        return await finished(manager.submit("teacher", [course("A"), course("B"), course("C")]))
+
+    try:
+        job = asyncio.run(run())
+        assert job.to_dict()["status"] == "done" and job.completed == 3
+        with zipfile.ZipFile(job.path) as archive:
+            assert sorted(archive.namelist()) == ["calificaciones_A.pdf", "calificaciones_B.pdf", "calificaciones_C.pdf"]
+    finally:
+        manager.shutdown()
+
+
+def test_only_finished_jobs_are_evicted(db, tmp_path, monkeypatch):
+    manager = ExportJobManager(db, max_workers=1, max_in_flight=1, max_jobs=2, directory=str(tmp_path))
+
+    async def never_finishes(job):
+        await asyncio.Event().wait()
+
+    async def run():
+        monkeypatch.setattr(manager, "_run", never_finishes)
+        first = manager.submit("teacher", [course("A")])
+        second = manager.submit("teacher", [course("B")])
+        await asyncio.sleep(0)
+        with pytest.raises(ExportQueueFull):
+            manager.submit("teacher", [course("C")])
+
+        first.finished_at = "2025-01-01T00:00:00+00:00"
+        third = manager.submit("teacher", [course("C")])
+        assert list(manager.jobs) == [second.id, third.id]
+        manager.shutdown()
+
+    asyncio.run(run())
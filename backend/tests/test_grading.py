@@ -0,0 +1,138 @@
+import math
+
+import numpy as np
+import pytest
+
+from grading import (
+    DEFAULT_SCHEME, cortes_matrix, corte_labels, final_grades, grade_projection, grade_statistics, percentile_standing,
+    recomputed_finals, round_grades, scheme_error, sorted_columns,
+)
+
+
+def scheme(weights, decimals=2, rounding="half_up"):
+    return {
+        "components": [{"column": column, "name": column, "weight": weight} for column, weight in weights.items()],
+        "decimals": decimals,
+        "rounding": rounding,
+    }
+
+
+@pytest.mark.parametrize("raw, decimals, mode, expected", [
+    # 4.0 * 0.3 + 3.0 * 0.35 + 2.0 * 0.35 is 2.9499999... in binary floating point
+    (4.0 * 0.3 + 3.0 * 0.35 + 2.0 * 0.35, 2, 0, 2.95),
+    (2.25, 1, 0, 2.3),
+    (2.249, 1, 0, 2.2),
+    (3.1 * 0.4 + 2.6 * 0.6, 1, 1, 2.8),
+    (2.89, 1, 1, 2.8),
+    (0.1 * 10 + 2.0, 0, 2, 3.0),
+    (3.01, 0, 2, 4.0),
+    (5.0, 2, 2, 5.0),
+])
+def test_round_grades_matches_numeric_rounding(raw, decimals, mode, expected):
+    # SQL rounds exact numerics, so values that are only off by binary error must land on the same side
+    assert round_grades(np.array([raw]), np.array([float(decimals)]), np.array([mode]))[0] == expected
+
+
+def test_final_grades_default_scheme_and_missing_cortes():
+    cortes = cortes_matrix([
+        {"corte1": 4.0, "corte2": 3.0, "corte3": 2.0},
+        {"corte1": 5.0, "corte2": None, "corte3": 5.0},
+        {},
+    ])
+    finals = final_grades(cortes)
+    assert finals[0] == 2.95
+    assert math.isnan(finals[1]) and math.isnan(finals[2])
+
+
+def test_final_grades_ignores_unweighted_cortes():
+    two_parts = scheme({"corte1": 0.4, "corte3": 0.6}, decimals=1, rounding="floor")
+    finals = final_grades(cortes_matrix([{"corte1": 4.0, "corte2": None, "corte3": 2.0}]), [two_parts])
+    assert finals[0] == 2.8
+
+
+def test_final_grades_uses_each_rows_scheme():
+    cortes = cortes_matrix([{"corte1": 3.0, "corte2": 4.0, "corte3": 5.0}] * 2)
+    finals = final_grades(cortes, [None, scheme({"corte3": 1.0})], [0, 1])
+    assert finals.tolist() == [4.05, 5.0]
+
+
+def test_recomputed_finals_only_returns_changed_rows():
+    rows = [
+        {"id": "a", "corte1": 4.0, "corte2": 3.0, "corte3": 2.0, "final_grade": 2.95},
+        {"id": "b", "corte1": 4.0, "corte2": 3.0, "corte3": 2.0, "final_grade": 1.0},
+        {"id": "c", "corte1": None, "corte2": 3.0, "corte3": 2.0, "final_grade": None},
+    ]
+    assert recomputed_finals(rows, [None], [0, 0, 0]) == [("b", 2.95)]
+
+
+@pytest.mark.parametrize("candidate, error", [
+    (DEFAULT_SCHEME, None),
+    (scheme({"corte1": 0.5, "corte2": 0.4}), "Los pesos deben ser positivos y sumar 1"),
+    (scheme({"corte1": 1.0}, decimals=3), "Los decimales deben estar entre 0 y 2"),
+    (scheme({"corte1": 1.0}, rounding="bankers"), "Modo de redondeo inválido"),
+    (scheme({"corte4": 1.0}), "Cada componente debe usar un corte distinto (corte1, corte2 o corte3)"),
+])
+def test_scheme_error(candidate, error):
+    assert scheme_error(candidate) == error
+
+
+def test_corte_labels():
+    assert corte_labels(None) == ["Corte 1 (30%)", "Corte 2 (35%)", "Corte 3 (35%)"]
+    assert corte_labels(scheme({"corte1": 0.4, "corte3": 0.6})) == ["corte1 (40%)", "Corte 2", "corte3 (60%)"]
+
+
+def test_grade_projection():
+    cortes = cortes_matrix([
+        {"corte1": 2.0, "corte2": 2.5},
+        {"corte1": 4.5, "corte2": 4.5},
+        {"corte1": 1.0, "corte2": 1.0},
+        {"corte1": 4.0, "corte2": 3.0, "corte3": 2.0},
+    ])
+    projection = grade_projection(cortes, None, risk_threshold=4.0)
+    # (3.0 - 2.0 * 0.3 - 2.5 * 0.35) / 0.35 = 4.357..., rounded up to the 0.1 step
+    assert projection["required"][0] == 4.4
+    assert projection["required"][1] == 0.3
+    assert projection["required"][2] > 5.0
+    assert math.isnan(projection["required"][3])
+    assert projection["best"].tolist() == [3.23, 4.68, 2.4, 2.95]
+    assert projection["worst"].tolist() == [1.48, 2.93, 0.65, 2.95]
+    assert projection["status"].tolist() == [2, 3, 1, 1]
+    assert projection["at_risk"].tolist() == [True, False, True, True]
+
+
+def test_percentile_standing():
+    columns = sorted_columns([{"corte1": value, "final_grade": value} for value in (1.0, 2.0, 3.0, 3.0, 4.0, 5.0)])
+    standing = percentile_standing(columns, {"corte1": 3.0, "final_grade": 5.0}, min_cohort=5)
+    # ties count half: two values below and two equal out of six
+    assert standing["corte1"] == {"percentile": 50.0, "quartile": 3}
+    assert standing["final_grade"] == {"percentile": 91.7, "quartile": 4}
+    assert standing["corte2"] is None
+
+
+def test_percentile_standing_withholds_small_cohorts():
+    columns = sorted_columns([{"corte1": 1.0}, {"corte1": 5.0}])
+    assert percentile_standing(columns, {"corte1": 5.0}, min_cohort=5)["corte1"] is None
+
+
+def test_grade_statistics_per_course():
+    rows = [
+        {"course_id": "a", "corte1": 1.0, "final_grade": 2.0},
+        {"course_id": "a", "corte1": 3.0, "final_grade": 4.0},
+        {"course_id": "a", "corte1": 5.0},
+        {"course_id": "a"},
+    ]
+    stats = grade_statistics(rows, ["a", "empty"])
+    course = stats["a"]
+    assert (course["students"], course["pass_rate"]) == (4, 0.5)
+    assert course["missing_cortes"] == {"corte1": 1, "corte2": 4, "corte3": 4, "total": 9}
+
+    corte1 = course["columns"]["corte1"]
+    assert {name: corte1[name] for name in ("count", "mean", "median", "std", "min", "max")} == {
+        "count": 3, "mean": 3.0, "median": 3.0, "std": 1.633, "min": 1.0, "max": 5.0,
+    }
+    assert corte1["percentiles"] == {"p10": 1.4, "p25": 2.0, "p75": 4.0, "p90": 4.6}
+    # 0.5-wide buckets; the top grade falls in the last one
+    assert corte1["histogram"] == [0, 0, 1, 0, 0, 0, 1, 0, 0, 1]
+
+    empty = stats["empty"]
+    assert (empty["students"], empty["pass_rate"], empty["columns"]["final_grade"]["mean"]) == (0, None, None)
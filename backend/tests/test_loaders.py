@@ -0,0 +1,63 @@
+import asyncio
+
+from loaders import LoaderStats, RowLoader
+
+
+def add_rows(db, count):
+    rows = [db.backend.new_row("courses", {"name": f"Curso {i}"}) for i in range(count)]
+    db.backend.insert_rows("courses", rows)
+    return rows
+
+
+def test_lookups_in_one_iteration_share_a_query(db):
+    rows = add_rows(db, 3)
+    queries = []
+    db.on_query = lambda table, operation, seconds: queries.append((table, operation))
+    loader = RowLoader(db, "courses", LoaderStats())
+
+    async def run():
+        keys = [rows[0]["id"], rows[1]["id"], rows[0]["id"], "missing"]
+        first = await asyncio.gather(*(loader.load(key) for key in keys))
+        again = await loader.load(rows[2]["id"])
+        return first, again
+
+    first, again = asyncio.run(run())
+    assert [row and row["name"] for row in first] == ["Curso 0", "Curso 1", "Curso 0", None]
+    assert again["name"] == "Curso 2"
+    assert len(queries) == 2
+    assert loader.stats.to_dict() == {"lookups": 5, "coalesced": 3, "queries": 2}
+
+
+def test_rows_are_copies_and_forget_reloads(db):
+    (row,) = add_rows(db, 1)
+    loader = RowLoader(db, "courses", LoaderStats())
+
+    async def run():
+        loaded = await loader.load(row["id"])
+        loaded["name"] = "changed by the caller"
+        cached = await loader.load(row["id"])
+        row["name"] = "written by the request"
+        loader.forget(row["id"])
+        return cached, await loader.load(row["id"])
+
+    cached, reloaded = asyncio.run(run())
+    assert cached["name"] == "Curso 0"
+    assert reloaded["name"] == "written by the request"
+    assert loader.stats.queries == 2
+
+
+def test_dispatch_task_is_held_until_it_finishes(db):
+    (row,) = add_rows(db, 1)
+    db.backend.latency = 0.01
+    loader = RowLoader(db, "courses", LoaderStats())
+
+    async def run():
+        load = asyncio.ensure_future(loader.load(row["id"]))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        held = set(loader._tasks)
+        await load
+        return held
+
+    held = asyncio.run(run())
+    assert len(held) == 1 and not loader._tasks
@@ -0,0 +1,32 @@
+from metrics import Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, '/a"b')
+    assert histogram.render().splitlines() == [
+        "# HELP demo_seconds Demo.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a\\"b",le="0.1"} 2',
+        'demo_seconds_bucket{route="/a\\"b",le="1.0"} 3',
+        'demo_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a\\"b"} 3.65',
+        'demo_seconds_count{route="/a\\"b"} 4',
+    ]
+
+
+def test_requests_are_labelled_by_route_template(client, teacher, course):
+    _, headers = teacher
+    for _ in range(2):
+        assert client.get(f"/api/courses/{course['id']}", headers=headers).status_code == 200
+    client.get("/api/no-such-route")
+
+    text = client.get("/api/metrics", headers=headers).text
+    assert text.startswith("# HELP http_request_duration_seconds")
+    series = [line for line in text.splitlines() if line.startswith("http_request_duration_seconds_count")]
+    assert any('method="GET",route="/api/courses/{course_id}",status="200"' in line for line in series)
+    assert not any(course["id"] in line for line in series)
+    assert any('route="unmatched",status="404"' in line for line in series)
+    assert 'db_query_duration_seconds_count{table="users",operation="select"}' in text
+    assert 'http_request_db_round_trips_count{method="GET",route="/api/courses/{course_id}"}' in text
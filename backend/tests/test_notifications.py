@@ -0,0 +1,181 @@
+import asyncio
+
+from notifications import NotificationHub, NotificationQueue, UnreadCounter
+
+
+def notification(db, user_id="user", **values):
+    return db.backend.new_row("notifications", {"user_id": user_id, "message": "m", "type": "grade_update", "read": False, **values})
+
+
+def test_queue_coalesces_rows_into_batches(db):
+    batches = []
+    queue = NotificationQueue(db, max_batch=3, flush_interval=0.05, max_size=100, on_flush=lambda rows: batches.append(len(rows)))
+
+    async def run():
+        for _ in range(7):
+            await queue.put(notification(db))
+        while queue.flushed < 7:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(run())
+    assert batches == [3, 3, 1]
+    assert len(db.backend.rows("notifications")) == 7
+    assert {key: queue.stats()[key] for key in ("enqueued", "flushed", "flushes", "failed", "depth")} == {
+        "enqueued": 7, "flushed": 7, "flushes": 3, "failed": 0, "depth": 0,
+    }
+
+
+def test_put_blocks_while_the_buffer_is_full(db):
+    db.backend.latency = 0.05
+    queue = NotificationQueue(db, max_batch=1, flush_interval=0, max_size=1)
+
+    async def run():
+        await queue.put(notification(db))
+        await asyncio.sleep(0)
+        # The first row is being written; the second fills the buffer
+        await queue.put(notification(db))
+        blocked = asyncio.ensure_future(queue.put(notification(db)))
+        await asyncio.sleep(0.01)
+        waited = not blocked.done()
+        await blocked
+        await queue.stop()
+        return waited
+
+    assert asyncio.run(run())
+    assert queue.flushed == 3
+
+
+def test_stop_drains_buffered_rows(db):
+    batches = []
+    queue = NotificationQueue(db, max_batch=100, flush_interval=60, max_size=100, on_flush=lambda rows: batches.append(len(rows)))
+
+    async def run():
+        for _ in range(5):
+            await queue.put(notification(db))
+        await asyncio.wait_for(queue.stop(), 1)
+
+    asyncio.run(run())
+    assert batches == [5] and len(db.backend.rows("notifications")) == 5
+
+
+def test_failed_flushes_are_counted(db, monkeypatch):
+    queue = NotificationQueue(db, max_batch=10, flush_interval=0, max_size=10)
+
+    def broken_insert(table, rows):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(db.backend, "insert_rows", broken_insert)
+
+    async def run():
+        await queue.put(notification(db))
+        await queue.stop()
+
+    asyncio.run(run())
+    assert (queue.flushed, queue.failed) == (0, 1)
+
+
+def event_ids(events):
+    return None if events is None else [event_id for event_id, _ in events]
+
+
+def test_replay_resumes_after_the_last_event_seen():
+    hub = NotificationHub(history_size=10, max_users=10, max_pending=10)
+    hub.publish([{"user_id": "ana"}, {"user_id": "beto"}, {"user_id": "ana"}])
+    assert event_ids(hub.replay("ana", 0)) == [1, 3]
+    assert event_ids(hub.replay("ana", 1)) == [3]
+    assert event_ids(hub.replay("carla", 2)) == []
+    # An id this process never issued (e.g. from before a restart) cannot be resumed
+    assert hub.replay("ana", 4) is None
+
+
+def test_replay_past_rotated_events_needs_a_reset():
+    hub = NotificationHub(history_size=2, max_users=10, max_pending=10)
+    hub.publish([{"user_id": "ana"}] * 3)
+    assert hub.replay("ana", 0) is None
+    assert event_ids(hub.replay("ana", 1)) == [2, 3]
+
+
+def test_replay_after_a_history_was_evicted_needs_a_reset():
+    hub = NotificationHub(history_size=10, max_users=1, max_pending=10)
+    hub.publish([{"user_id": "ana"}, {"user_id": "ana"}, {"user_id": "beto"}])
+    # ana's history (events 1 and 2) was dropped to make room for beto's
+    assert hub.replay("ana", 1) is None
+    assert event_ids(hub.replay("ana", 3)) == []
+
+    hub.publish([{"user_id": "ana"}])
+    # The new history only vouches for events from its creation on, so a
+    # client that missed event 2 is not handed event 4 alone
+    assert hub.replay("ana", 1) is None
+    assert event_ids(hub.replay("ana", 3)) == [4]
+
+
+def test_subscribers_get_their_own_events_until_they_overflow():
+    async def run():
+        hub = NotificationHub(history_size=10, max_users=10, max_pending=1)
+        ana, beto = hub.subscribe("ana"), hub.subscribe("beto")
+        hub.publish([{"user_id": "ana"}])
+        delivered = ana.queue.get_nowait()
+        hub.publish([{"user_id": "ana"}, {"user_id": "ana"}])
+        hub.unsubscribe(ana)
+        hub.unsubscribe(beto)
+        return delivered, ana.overflowed, beto.queue.empty(), hub.stats()
+
+    delivered, overflowed, beto_empty, stats = asyncio.run(run())
+    assert delivered[0] == 1 and overflowed and beto_empty
+    assert stats == {"published": 3, "subscribers": 0, "users_connected": 0}
+
+
+def test_unread_counter_is_seeded_once_and_then_adjusted(db):
+    db.backend.insert_rows("notifications", [notification(db), notification(db), notification(db, read=True), notification(db, "other")])
+    queries = []
+    db.on_query = lambda table, operation, seconds: queries.append(table)
+    counter = UnreadCounter(db, max_users=10, ttl=60)
+
+    async def run():
+        seeded = await counter.get("user")
+        counter.notifications_flushed([notification(db), notification(db, read=True), notification(db, "other")])
+        counter.add("user", -5)
+        clamped = await counter.get("user")
+        counter.add("user", 1)
+        counter.invalidate("user")
+        return seeded, clamped, await counter.get("user")
+
+    assert asyncio.run(run()) == (2, 0, 2)
+    # Counts for users never asked about are not tracked
+    assert counter.stats()["size"] == 1
+    assert queries == ["notifications", "notifications"]
+
+
+def test_websocket_resets_clients_whose_events_rotated_out(client, register, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "NOTIFICATION_STREAM_KEEPALIVE_SECONDS", 0.05)
+    user, headers = register("student")
+    token = headers["Authorization"].split()[1]
+    hub = server.notification_hub
+    rows = [notification(server.db, user["id"], message=str(i), created_at="2025-01-01T00:00:00+00:00") for i in range(hub.history_size + 1)]
+
+    hub.publish(rows[:1])
+    first = hub.published
+    with client.websocket_connect(f"/api/notifications/ws?token={token}&last_event_id={first - 1}") as websocket:
+        message = websocket.receive_json()
+    assert (message["event"], message["id"], message["data"]["message"]) == ("notification", first, "0")
+
+    hub.publish(rows[1:])
+    with client.websocket_connect(f"/api/notifications/ws?token={token}&last_event_id={first - 1}") as websocket:
+        message = websocket.receive_json()
+    assert (message["event"], message["id"]) == ("reset", hub.published)
+
+
+def test_unread_count_follows_writes_and_reads(client, register):
+    import server
+
+    user, headers = register("student")
+    assert client.get("/api/notifications/unread-count", headers=headers).json() == {"unread": 0}
+    server.notifications_flushed([notification(server.db, user["id"]) for _ in range(3)])
+    assert client.get("/api/notifications/unread-count", headers=headers).json() == {"unread": 3}
+
+    server.db.backend.insert_rows("notifications", [notification(server.db, user["id"]) for _ in range(3)])
+    assert client.put("/api/notifications/read", headers=headers, json={"all": True}).json()["updated"] == 3
+    assert client.get("/api/notifications/unread-count", headers=headers).json() == {"unread": 0}
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+import pytest
+
+from passwords import HasherBusy, PasswordHasher
+
+
+class SlowContext:
+    """Stands in for CryptContext; hash() blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify_and_update(self, password, hashed):
+        return hashed == f"hashed:{password}", None
+
+
+def test_calls_beyond_max_pending_fail_fast():
+    context = SlowContext()
+    timings = []
+    hasher = PasswordHasher(context, max_workers=1, max_pending=2, on_timing=lambda operation, seconds: timings.append(operation))
+
+    async def run():
+        queued = [asyncio.ensure_future(hasher.hash(str(i))) for i in range(2)]
+        await asyncio.sleep(0)
+        assert hasher.pending == 2
+        with pytest.raises(HasherBusy):
+            await hasher.hash("rejected")
+        context.release.set()
+        return await asyncio.gather(*queued), await hasher.verify("0", "hashed:0")
+
+    try:
+        hashes, verified = asyncio.run(run())
+    finally:
+        hasher.shutdown()
+    assert hashes == ["hashed:0", "hashed:1"] and verified == (True, None)
+    assert (hasher.pending, hasher.rejected, timings) == (0, 1, ["hash", "hash", "verify"])
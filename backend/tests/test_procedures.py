@@ -0,0 +1,209 @@
+"""The MemoryBackend procedures must behave like the SQL functions in supabase/migrations."""
+import asyncio
+
+import pytest
+from postgrest.exceptions import APIError
+
+from database import FOREIGN_KEY_VIOLATION, FORBIDDEN, NOT_FOUND, SERIALIZATION_FAILURE, UNIQUE_VIOLATION
+from grading import SUMMARY_FIELDS
+
+TEACHER = "11111111-1111-1111-1111-111111111111"
+
+
+def rpc(db, name, **params):
+    return asyncio.run(db.rpc(name, params).execute()).data
+
+
+def add_course(db, grading_scheme=None):
+    backend = db.backend
+    course = backend.new_row("courses", {"name": "Curso", "code": backend.new_row("x", {})["id"][:8], "teacher_id": TEACHER, "grading_scheme": grading_scheme})
+    backend.insert_rows("courses", [course])
+    return course
+
+
+def add_student(db, course, name="Estudiante"):
+    student_id = db.backend.new_row("users", {})["id"]
+    enrollment = rpc(db, "enroll_student", p_student_id=student_id, p_student_name=name, p_course_id=course["id"])
+    return enrollment, db.backend.find("grades", enrollment_id=enrollment["id"])[0]
+
+
+def raises(code, func, *args, **kwargs):
+    with pytest.raises(APIError) as error:
+        func(*args, **kwargs)
+    assert error.value.code == code
+
+
+def test_enroll_student_creates_an_empty_grade_row(db):
+    course = add_course(db)
+    enrollment, grade = add_student(db, course)
+    assert grade["course_id"] == course["id"] and grade["student_id"] == enrollment["student_id"]
+    assert [grade[column] for column in ("corte1", "corte2", "corte3", "final_grade")] == [None] * 4
+    raises(UNIQUE_VIOLATION, rpc, db, "enroll_student", p_student_id=enrollment["student_id"], p_student_name="x", p_course_id=course["id"])
+    raises(FOREIGN_KEY_VIOLATION, rpc, db, "enroll_student", p_student_id=enrollment["student_id"], p_student_name="x", p_course_id="missing")
+
+
+def test_upsert_grade_merges_cortes_and_keeps_final_until_complete(db):
+    course = add_course(db)
+    enrollment, _ = add_student(db, course)
+    first = rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=4.0)
+    assert (first["corte1"], first["final_grade"], first["course_name"]) == (4.0, None, "Curso")
+
+    second = rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte2=3.0, p_corte3=2.0)
+    assert (second["corte1"], second["corte2"], second["corte3"], second["final_grade"]) == (4.0, 3.0, 2.0, 2.95)
+
+
+def test_upsert_grade_errors(db):
+    course = add_course(db)
+    enrollment, _ = add_student(db, course)
+    raises(NOT_FOUND, rpc, db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id="missing", p_corte1=1.0)
+    raises(FORBIDDEN, rpc, db, "upsert_grade", p_teacher_id="someone-else", p_enrollment_id=enrollment["id"], p_corte1=1.0)
+
+
+def test_upsert_grade_version_check(db):
+    course = add_course(db)
+    enrollment, grade = add_student(db, course)
+    stamp = grade["last_updated"]
+    rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=4.0, p_expected_last_updated=stamp)
+    raises(SERIALIZATION_FAILURE, rpc, db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=1.0,
+           p_expected_last_updated=stamp)
+    assert db.backend.find("grades", enrollment_id=enrollment["id"])[0]["corte1"] == 4.0
+
+
+def test_upsert_grade_uses_course_scheme(db):
+    scheme = {"components": [{"column": "corte1", "name": "P", "weight": 0.4}, {"column": "corte3", "name": "F", "weight": 0.6}],
+              "decimals": 1, "rounding": "floor"}
+    course = add_course(db, scheme)
+    enrollment, _ = add_student(db, course)
+    grade = rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=3.1, p_corte3=2.6)
+    # scheme_final_grade: floor((3.1 * 0.4 + 2.6 * 0.6) * 10) / 10
+    assert grade["final_grade"] == 2.8
+
+
+def test_bulk_upsert_grades(db):
+    course = add_course(db)
+    (first, grade), (second, _) = add_student(db, course), add_student(db, course)
+    rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=second["id"], p_corte1=5.0)
+    stale = grade["last_updated"]
+    rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=first["id"], p_corte1=1.0)
+
+    results = rpc(db, "bulk_upsert_grades", p_teacher_id=TEACHER, p_course_id=course["id"], p_rows=[
+        {"enrollment_id": second["id"], "corte1": None, "corte2": 3.0, "corte3": 2.0},
+        {"enrollment_id": first["id"], "corte1": 4.0, "expected_last_updated": stale},
+        {"enrollment_id": "00000000-0000-0000-0000-000000000000", "corte1": 4.0},
+    ])
+    assert [(result["position"], result["status"]) for result in results] == [(0, "ok"), (1, "conflict"), (2, "not_found")]
+    # corte1 was not sent for the first row, so the stored 5.0 is kept
+    assert (results[0]["grade"]["corte1"], results[0]["grade"]["final_grade"]) == (5.0, 3.25)
+    assert db.backend.find("grades", enrollment_id=first["id"])[0]["corte1"] == 1.0
+
+    raises(FORBIDDEN, rpc, db, "bulk_upsert_grades", p_teacher_id="someone-else", p_course_id=course["id"], p_rows=[])
+    raises(NOT_FOUND, rpc, db, "bulk_upsert_grades", p_teacher_id=TEACHER, p_course_id="missing", p_rows=[])
+
+
+def test_set_final_grades_only_touches_changed_rows(db):
+    course = add_course(db)
+    (_, first), (_, second) = add_student(db, course), add_student(db, course)
+    first.update(final_grade=3.0, last_updated="2025-01-01T00:00:00+00:00")
+    second.update(final_grade=2.0, last_updated="2025-01-01T00:00:00+00:00")
+    result = rpc(db, "set_final_grades", p_ids=[first["id"], second["id"]], p_final_grades=[3.0, 2.5],
+                 p_last_updated=["2025-01-01T00:00:00+00:00"] * 2)
+    assert result == {"changed": 1, "skipped": [first["id"]]}
+    assert first["last_updated"] == "2025-01-01T00:00:00+00:00"
+    assert (second["final_grade"], second["last_updated"] > "2025-01-01T00:00:00+00:00") == (2.5, True)
+
+
+def test_set_final_grades_skips_rows_saved_since_the_read(db):
+    course = add_course(db)
+    enrollment, grade = add_student(db, course)
+    read_at = grade["last_updated"] = "2000-01-01T00:00:00+00:00"
+    saved = rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=4.0, p_corte2=3.0, p_corte3=2.0)
+
+    result = rpc(db, "set_final_grades", p_ids=[grade["id"]], p_final_grades=[1.0], p_last_updated=[read_at])
+    assert result == {"changed": 0, "skipped": [grade["id"]]}
+    assert (grade["final_grade"], grade["last_updated"]) == (2.95, saved["last_updated"])
+
+
+def test_course_grades_version_changes_on_write(db):
+    course = add_course(db)
+    assert rpc(db, "course_grades_version", p_course_id=course["id"]) == {"count": 0, "last_updated": None}
+    enrollment, grade = add_student(db, course)
+    before = rpc(db, "course_grades_version", p_course_id=course["id"])
+    assert before == {"count": 1, "last_updated": grade["last_updated"]}
+    grade["last_updated"] = "2000-01-01T00:00:00+00:00"
+    rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollment["id"], p_corte1=1.0)
+    assert rpc(db, "course_grades_version", p_course_id=course["id"]) != before
+
+
+def test_grade_summaries_follow_every_write(db):
+    course = add_course(db)
+    enrollments = [add_student(db, course)[0] for _ in range(3)]
+    rpc(db, "upsert_grade", p_teacher_id=TEACHER, p_enrollment_id=enrollments[0]["id"], p_corte1=4.0, p_corte2=3.0, p_corte3=2.0)
+    rpc(db, "bulk_upsert_grades", p_teacher_id=TEACHER, p_course_id=course["id"], p_rows=[
+        {"enrollment_id": enrollments[1]["id"], "corte1": 5.0},
+        {"enrollment_id": enrollments[2]["id"], "corte1": 1.5, "corte3": 3.0},
+    ])
+    db.backend.delete_rows("enrollments", [enrollments[2]])
+
+    summary = rpc(db, "course_grade_summary", p_course_id=course["id"])
+    assert (summary["students"], summary["pending_cortes"]) == (2, 2)
+    assert (summary["corte1_count"], summary["corte1_sum"], summary["corte1_sumsq"]) == (2, 9.0, 41.0)
+    assert (summary["final_grade_count"], summary["final_grade_sum"]) == (1, 2.95)
+    assert rpc(db, "rebuild_course_grade_summaries", p_course_id=None, p_apply=False) == []
+
+
+def test_rebuild_course_grade_summaries_reports_and_repairs_drift(db):
+    course = add_course(db)
+    add_student(db, course)
+    summary = db.backend.find("course_grade_summaries", course_id=course["id"])[0]
+    summary["students"] = 7
+
+    drift = rpc(db, "rebuild_course_grade_summaries", p_course_id=course["id"], p_apply=True)
+    assert [(entry["course_id"], entry["stored"]["students"], entry["expected"]["students"]) for entry in drift] == [(course["id"], 7, 1)]
+    assert set(SUMMARY_FIELDS) <= set(drift[0]["expected"])
+    assert rpc(db, "rebuild_course_grade_summaries", p_course_id=course["id"], p_apply=False) == []
+
+
+def test_course_roster_keyset_pages_cover_every_row_once(db):
+    course = add_course(db)
+    users = []
+    for i, name in enumerate(("Ana", "Beto", "Ana", "Carla", "Dario")):
+        user = db.backend.new_row("users", {"full_name": name, "email": f"student{i}@example.com", "role": "student"})
+        db.backend.insert_rows("users", [user])
+        rpc(db, "enroll_student", p_student_id=user["id"], p_student_name=name, p_course_id=course["id"])
+        users.append(user)
+
+    seen, after_key, after_id = [], None, None
+    while True:
+        page = rpc(db, "course_roster", p_teacher_id=TEACHER, p_course_id=course["id"], p_limit=2, p_after_key=after_key, p_after_id=after_id)
+        assert page["total"] == 5
+        seen.extend(page["rows"])
+        if len(page["rows"]) < 2:
+            break
+        after_key, after_id = page["rows"][-1]["sort_key"], page["rows"][-1]["enrollment_id"]
+
+    assert sorted(row["student_id"] for row in seen) == sorted(user["id"] for user in users)
+    assert [row["student_name"] for row in seen] == ["Ana", "Ana", "Beto", "Carla", "Dario"]
+    raises(FORBIDDEN, rpc, db, "course_roster", p_teacher_id="someone-else", p_course_id=course["id"])
+
+
+def test_notifications_page_orders_by_created_at_then_id(db):
+    user_id = "22222222-2222-2222-2222-222222222222"
+    stamps = ["2025-01-01T00:00:00+00:00"] * 3 + ["2025-01-02T00:00:00+00:00"] * 2
+    db.backend.insert_rows("notifications", [
+        db.backend.new_row("notifications", {"user_id": user_id, "message": str(i), "type": "grade_update", "created_at": stamp})
+        for i, stamp in enumerate(stamps)
+    ])
+
+    seen, cursor = [], (None, None)
+    while True:
+        page = rpc(db, "notifications_page", p_user_id=user_id, p_limit=2, p_before_created_at=cursor[0], p_before_id=cursor[1])
+        seen.extend(page)
+        if len(page) < 2:
+            break
+        cursor = (page[-1]["created_at"], page[-1]["id"])
+
+    assert len(seen) == 5 and len({row["id"] for row in seen}) == 5
+    keys = [(row["created_at"], row["id"]) for row in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert rpc(db, "mark_notifications_read", p_user_id=user_id, p_ids=[seen[0]["id"]]) == 1
+    assert rpc(db, "mark_notifications_read", p_user_id=user_id) == 4
@@ -0,0 +1,64 @@
+import asyncio
+import io
+import zipfile
+from xml.etree import ElementTree
+
+from reports import stream_csv, stream_xlsx
+
+SHEET = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+HEADER = ["Curso", "Estudiante", "Nota Final"]
+PAGES = [[["PA-1", "Ana <Ñ>", 4.5], ["PA-1", "Beto & Co", None]], [["PA-2", "Carla", 3]]]
+
+
+async def pages():
+    for page in PAGES:
+        yield page
+
+
+def collect(stream) -> list:
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def sheet_rows(workbook: bytes) -> list:
+    with zipfile.ZipFile(io.BytesIO(workbook)) as archive:
+        assert archive.testzip() is None
+        sheet = ElementTree.fromstring(archive.read("xl/worksheets/sheet1.xml"))
+    rows = []
+    for row in sheet.iter(f"{SHEET}row"):
+        values = []
+        for cell in row:
+            text = cell.find(f"{SHEET}is/{SHEET}t")
+            number = cell.find(f"{SHEET}v")
+            values.append(text.text if text is not None else float(number.text) if number is not None else None)
+        rows.append(values)
+    return rows
+
+
+def test_xlsx_is_written_one_page_at_a_time():
+    chunks = collect(stream_xlsx(HEADER, pages()))
+    # header, one chunk per page, then the closing parts and central directory
+    assert len(chunks) == len(PAGES) + 2
+    assert sheet_rows(b"".join(chunks)) == [HEADER, ["PA-1", "Ana <Ñ>", 4.5], ["PA-1", "Beto & Co", None], ["PA-2", "Carla", 3.0]]
+
+
+def test_csv_starts_with_a_bom_and_blanks_missing_values():
+    text = b"".join(collect(stream_csv(HEADER, pages()))).decode()
+    assert text.splitlines() == ["\ufeffCurso,Estudiante,Nota Final", "PA-1,Ana <Ñ>,4.5", "PA-1,Beto & Co,", "PA-2,Carla,3"]
+
+
+def test_period_xlsx_export_pages_through_every_grade(client, teacher, course, enroll, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "EXPORT_PAGE_SIZE", 2)
+    _, headers = teacher
+    for name in ("Ana", "Beto", "Carla"):
+        enroll(name)
+
+    response = client.get(f"/api/grades/export/period/{course['academic_period']}", headers=headers, params={"format": "xlsx"})
+    assert response.status_code == 200, response.text
+    assert response.headers["content-disposition"] == f"attachment; filename=calificaciones_{course['academic_period']}.xlsx"
+    rows = sheet_rows(response.content)
+    assert rows[0] == ["Curso", "Estudiante", "Corte 1 (30%)", "Corte 2 (35%)", "Corte 3 (35%)", "Nota Final"]
+    assert [row[:2] for row in rows[1:]] == [[course["code"], name] for name in ("Ana", "Beto", "Carla")]
@@ -0,0 +1,49 @@
+import json
+from decimal import Decimal
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from serialization import RowSerializer
+
+
+class Item(BaseModel):
+    id: str
+    score: Optional[float] = None
+    count: int
+    active: bool
+
+
+class Scheme(BaseModel):
+    weight: float
+
+
+class Owner(BaseModel):
+    id: str
+    scheme: Optional[Scheme] = None
+    tags: List[str] = []
+
+
+ROWS = [
+    {"id": "a", "score": 4, "count": 1, "active": True, "extra": "dropped"},
+    {"id": "b", "score": Decimal("2.95"), "count": 2, "active": False},
+    {"id": "c", "score": None, "count": 3, "active": True},
+]
+
+
+def test_trusted_rows_render_like_validated_ones():
+    trusted, validated = RowSerializer(Item, trusted=True), RowSerializer(Item)
+    assert trusted.dumps(ROWS) == validated.dumps(ROWS)
+    assert json.loads(validated.dumps(ROWS))[0] == {"id": "a", "score": 4.0, "count": 1, "active": True}
+
+
+def test_only_validation_normalizes_nested_values():
+    rows = [{"id": "a", "scheme": {"weight": 1, "name": "extra"}, "tags": ["x"]}]
+    assert json.loads(RowSerializer(Owner).dumps(rows)) == [{"id": "a", "scheme": {"weight": 1.0}, "tags": ["x"]}]
+    assert json.loads(RowSerializer(Owner, trusted=True).dumps(rows)) == rows
+
+
+def test_list_endpoints_validate_by_default():
+    import server
+
+    assert not any(serializer.trusted for serializer in (server.course_list, server.grade_list, server.notification_list))
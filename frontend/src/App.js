@@ -12,7 +12,7 @@ import StudentDashboard from "@/pages/StudentDashboard";
 import { Toaster } from "@/components/ui/sonner";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
-const API = `${BACKEND_URL}/api`;
+export const API = `${BACKEND_URL}/api`;
 
 export const api = axios.create({
   baseURL: API,
@@ -0,0 +1,18 @@
+const CORTE_COLUMNS = ["corte1", "corte2", "corte3"];
+
+const DEFAULT_SCHEME = {
+  components: [
+    { column: "corte1", name: "Corte 1", weight: 0.3 },
+    { column: "corte2", name: "Corte 2", weight: 0.35 },
+    { column: "corte3", name: "Corte 3", weight: 0.35 },
+  ],
+};
+
+// Header for each corte column under a course's grading scheme, e.g. "Corte 1 (30%)"
+export function corteLabels(scheme) {
+  const components = new Map((scheme || DEFAULT_SCHEME).components.map((component) => [component.column, component]));
+  return CORTE_COLUMNS.map((column, i) => {
+    const component = components.get(column);
+    return component ? `${component.name} (${Math.round(component.weight * 1000) / 10}%)` : `Corte ${i + 1}`;
+  });
+}
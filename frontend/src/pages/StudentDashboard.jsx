@@ -8,7 +8,8 @@ import { Label } from "@/components/ui/label";
 import { Badge } from "@/components/ui/badge";
 import { Progress } from "@/components/ui/progress";
 import { toast } from "sonner";
-import { api } from "@/App";
+import { api, API } from "@/App";
+import { corteLabels } from "@/lib/grading";
 import { GraduationCap, Plus, BookOpen, Award, Bell, LogOut, Loader2 } from "lucide-react";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 
@@ -16,8 +17,9 @@ export default function StudentDashboard({ user, setUser }) {
   const navigate = useNavigate();
   const [courses, setCourses] = useState([]);
   const [selectedCourse, setSelectedCourse] = useState(null);
-  const [grade, setGrade] = useState(null);
   const [notifications, setNotifications] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [unreadCount, setUnreadCount] = useState(0);
   const [loading, setLoading] = useState(false);
   const [enrollDialogOpen, setEnrollDialogOpen] = useState(false);
   const [accessCode, setAccessCode] = useState("");
@@ -25,37 +27,56 @@ export default function StudentDashboard({ user, setUser }) {
   useEffect(() => {
     loadCourses();
     loadNotifications();
-  }, []);
 
-  useEffect(() => {
-    if (selectedCourse) {
-      loadGrade(selectedCourse.id);
-    }
-  }, [selectedCourse]);
+    // EventSource cannot send headers, so the token goes in the query string
+    const token = localStorage.getItem("token");
+    const source = new EventSource(`${API}/notifications/stream?token=${encodeURIComponent(token)}`);
+    source.addEventListener("notification", (event) => {
+      const notification = JSON.parse(event.data);
+      setNotifications((current) => [notification, ...current.filter((n) => n.id !== notification.id)]);
+      setUnreadCount((count) => count + 1);
+      loadCourses();
+    });
+    source.addEventListener("reset", () => loadNotifications());
+    return () => source.close();
+  }, []);
 
+  // Courses, grades and the unread count come from one request; the server's
+  // weak ETag lets the browser revalidate it without a new body
   const loadCourses = async () => {
     try {
-      const response = await api.get("/courses/student");
-      setCourses(response.data);
+      const response = await api.get("/students/me/overview");
+      setCourses(response.data.courses);
+      setUnreadCount(response.data.unread_notifications);
     } catch (error) {
       toast.error("Error al cargar cursos");
     }
   };
 
-  const loadGrade = async (courseId) => {
+  const grade = selectedCourse
+    ? courses.find((course) => course.id === selectedCourse.id)?.grade ?? null
+    : null;
+  const labels = corteLabels(selectedCourse?.grading_scheme);
+
+  const loadNotifications = async () => {
     try {
-      const response = await api.get(`/grades/student/course/${courseId}`);
-      setGrade(response.data);
+      const [response, unread] = await Promise.all([
+        api.get("/notifications"),
+        api.get("/notifications/unread-count"),
+      ]);
+      setNotifications(response.data);
+      setNextCursor(response.headers["x-next-cursor"] || null);
+      setUnreadCount(unread.data.unread);
     } catch (error) {
-      console.error("Error loading grade");
-      setGrade(null);
+      console.error("Error loading notifications");
     }
   };
 
-  const loadNotifications = async () => {
+  const loadMoreNotifications = async () => {
     try {
-      const response = await api.get("/notifications");
-      setNotifications(response.data);
+      const response = await api.get("/notifications", { params: { cursor: nextCursor } });
+      setNotifications((current) => [...current, ...response.data]);
+      setNextCursor(response.headers["x-next-cursor"] || null);
     } catch (error) {
       console.error("Error loading notifications");
     }
@@ -86,14 +107,29 @@ export default function StudentDashboard({ user, setUser }) {
   };
 
   const markNotificationRead = async (notificationId) => {
+    const notification = notifications.find((n) => n.id === notificationId);
+    if (notification?.read) return;
     try {
       await api.put(`/notifications/${notificationId}/read`);
-      loadNotifications();
+      setNotifications((current) =>
+        current.map((n) => (n.id === notificationId ? { ...n, read: true } : n))
+      );
+      setUnreadCount((count) => Math.max(count - 1, 0));
     } catch (error) {
       console.error("Error marking notification as read");
     }
   };
 
+  const markAllNotificationsRead = async () => {
+    try {
+      await api.put("/notifications/read", { all: true });
+      setNotifications((current) => current.map((n) => ({ ...n, read: true })));
+      setUnreadCount(0);
+    } catch (error) {
+      console.error("Error marking notifications as read");
+    }
+  };
+
   const calculateProgress = (corte1, corte2, corte3) => {
     let completed = 0;
     if (corte1 !== null) completed += 33.33;
@@ -102,7 +138,6 @@ export default function StudentDashboard({ user, setUser }) {
     return Math.round(completed);
   };
 
-  const unreadCount = notifications.filter(n => !n.read).length;
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-blue-50 via-white to-emerald-50">
@@ -247,7 +282,7 @@ export default function StudentDashboard({ user, setUser }) {
                       <CardContent className="space-y-4">
                         <div className="space-y-2">
                           <div className="flex justify-between items-center">
-                            <span className="font-semibold">Corte 1 (30%)</span>
+                            <span className="font-semibold">{labels[0]}</span>
                             <Badge variant={grade.corte1 !== null ? "default" : "outline"} data-testid="corte1-badge">
                               {grade.corte1 !== null ? grade.corte1 : "Pendiente"}
                             </Badge>
@@ -257,7 +292,7 @@ export default function StudentDashboard({ user, setUser }) {
 
                         <div className="space-y-2">
                           <div className="flex justify-between items-center">
-                            <span className="font-semibold">Corte 2 (35%)</span>
+                            <span className="font-semibold">{labels[1]}</span>
                             <Badge variant={grade.corte2 !== null ? "default" : "outline"} data-testid="corte2-badge">
                               {grade.corte2 !== null ? grade.corte2 : "Pendiente"}
                             </Badge>
@@ -267,7 +302,7 @@ export default function StudentDashboard({ user, setUser }) {
 
                         <div className="space-y-2">
                           <div className="flex justify-between items-center">
-                            <span className="font-semibold">Corte 3 (35%)</span>
+                            <span className="font-semibold">{labels[2]}</span>
                             <Badge variant={grade.corte3 !== null ? "default" : "outline"} data-testid="corte3-badge">
                               {grade.corte3 !== null ? grade.corte3 : "Pendiente"}
                             </Badge>
@@ -357,9 +392,16 @@ export default function StudentDashboard({ user, setUser }) {
 
           {/* Notifications Tab */}
           <TabsContent value="notifications" className="space-y-6">
-            <div>
-              <h1 className="text-3xl font-bold text-gray-900" style={{fontFamily: 'Space Grotesk, sans-serif'}}>Notificaciones</h1>
-              <p className="text-gray-600 mt-1">Mantente al día con tus calificaciones</p>
+            <div className="flex items-center justify-between">
+              <div>
+                <h1 className="text-3xl font-bold text-gray-900" style={{fontFamily: 'Space Grotesk, sans-serif'}}>Notificaciones</h1>
+                <p className="text-gray-600 mt-1">Mantente al día con tus calificaciones</p>
+              </div>
+              {unreadCount > 0 && (
+                <Button variant="outline" onClick={markAllNotificationsRead} data-testid="mark-all-read-btn">
+                  Marcar todas como leídas
+                </Button>
+              )}
             </div>
 
             <div className="space-y-4">
@@ -401,6 +443,13 @@ export default function StudentDashboard({ user, setUser }) {
                   </CardContent>
                 </Card>
               )}
+              {nextCursor && (
+                <div className="text-center">
+                  <Button variant="ghost" onClick={loadMoreNotifications} data-testid="load-more-notifications-btn">
+                    Cargar más
+                  </Button>
+                </div>
+              )}
             </div>
           </TabsContent>
         </Tabs>
@@ -10,6 +10,7 @@ import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from "@
 import { Badge } from "@/components/ui/badge";
 import { toast } from "sonner";
 import { api } from "@/App";
+import { corteLabels } from "@/lib/grading";
 import { GraduationCap, Plus, BookOpen, Users, Bell, LogOut, Download, Edit, Trash2, Copy, Loader2 } from "lucide-react";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { AlertDialog, AlertDialogAction, AlertDialogCancel, AlertDialogContent, AlertDialogDescription, AlertDialogFooter, AlertDialogHeader, AlertDialogTitle, AlertDialogTrigger } from "@/components/ui/alert-dialog";
@@ -18,8 +19,9 @@ export default function TeacherDashboard({ user, setUser }) {
   const navigate = useNavigate();
   const [courses, setCourses] = useState([]);
   const [selectedCourse, setSelectedCourse] = useState(null);
-  const [students, setStudents] = useState([]);
+  const [studentCount, setStudentCount] = useState(0);
   const [grades, setGrades] = useState([]);
+  const [syncCursor, setSyncCursor] = useState(null);
   const [notifications, setNotifications] = useState([]);
   const [loading, setLoading] = useState(false);
   const [createDialogOpen, setCreateDialogOpen] = useState(false);
@@ -60,17 +62,56 @@ export default function TeacherDashboard({ user, setUser }) {
 
   const loadCourseDetails = async (courseId) => {
     try {
-      const [studentsRes, gradesRes] = await Promise.all([
-        api.get(`/courses/${courseId}/students`),
-        api.get(`/grades/course/${courseId}`),
-      ]);
-      setStudents(studentsRes.data);
-      setGrades(gradesRes.data);
+      // The roster is served in pages of at most ROSTER_PAGE_SIZE rows;
+      // follow X-Next-Cursor until the last page
+      const rows = [];
+      let cursor = null;
+      let total = 0;
+      do {
+        const response = await api.get(`/courses/${courseId}/roster`, { params: { sort: "student_name", cursor } });
+        rows.push(...response.data);
+        total = Number(response.headers["x-total-count"] || rows.length);
+        cursor = response.headers["x-next-cursor"] || null;
+      } while (cursor);
+      setGrades(rows);
+      setStudentCount(total);
+      const stamps = rows.map((row) => row.last_updated).filter(Boolean).sort();
+      setSyncCursor(stamps.length ? stamps[stamps.length - 1] : null);
     } catch (error) {
       toast.error("Error al cargar detalles del curso");
     }
   };
 
+  const mergeGrade = (row, grade) => ({
+    ...row,
+    grade_id: grade.id,
+    corte1: grade.corte1,
+    corte2: grade.corte2,
+    corte3: grade.corte3,
+    final_grade: grade.final_grade,
+    last_updated: grade.last_updated,
+  });
+
+  // Fetches only the grade rows changed since the last sync and merges them
+  // into the roster; falls back to a full reload for new enrollments
+  const syncGrades = async (courseId) => {
+    if (!syncCursor) {
+      return loadCourseDetails(courseId);
+    }
+    try {
+      const response = await api.get(`/grades/course/${courseId}`, { params: { since: syncCursor } });
+      const known = new Set(grades.map((row) => row.enrollment_id));
+      if (grades.length === studentCount && response.data.some((grade) => !known.has(grade.enrollment_id))) {
+        return loadCourseDetails(courseId);
+      }
+      const changed = new Map(response.data.map((grade) => [grade.enrollment_id, grade]));
+      setGrades((rows) => rows.map((row) => (changed.has(row.enrollment_id) ? mergeGrade(row, changed.get(row.enrollment_id)) : row)));
+      setSyncCursor(response.headers["x-sync-cursor"] || syncCursor);
+    } catch (error) {
+      loadCourseDetails(courseId);
+    }
+  };
+
   const loadNotifications = async () => {
     try {
       const response = await api.get("/notifications");
@@ -137,18 +178,23 @@ export default function TeacherDashboard({ user, setUser }) {
     try {
       const payload = {
         enrollment_id: selectedGrade.enrollment_id,
+        expected_last_updated: selectedGrade.last_updated || undefined,
       };
       if (gradeFormData.corte1) payload.corte1 = parseFloat(gradeFormData.corte1);
       if (gradeFormData.corte2) payload.corte2 = parseFloat(gradeFormData.corte2);
       if (gradeFormData.corte3) payload.corte3 = parseFloat(gradeFormData.corte3);
 
-      await api.post("/grades", payload);
+      const response = await api.post("/grades", payload);
+      setGrades((rows) => rows.map((row) => (row.enrollment_id === response.data.enrollment_id ? mergeGrade(row, response.data) : row)));
       toast.success("Calificación actualizada");
       setGradeDialogOpen(false);
       setGradeFormData({ corte1: "", corte2: "", corte3: "" });
-      loadCourseDetails(selectedCourse.id);
+      syncGrades(selectedCourse.id);
     } catch (error) {
       toast.error(error.response?.data?.detail || "Error al actualizar calificación");
+      if (error.response?.status === 409) {
+        syncGrades(selectedCourse.id);
+      }
     } finally {
       setLoading(false);
     }
@@ -206,6 +252,7 @@ export default function TeacherDashboard({ user, setUser }) {
   };
 
   const unreadCount = notifications.filter(n => !n.read).length;
+  const labels = corteLabels(selectedCourse?.grading_scheme);
 
   return (
     <div className="min-h-screen bg-gradient-to-br from-blue-50 via-white to-emerald-50">
@@ -431,7 +478,7 @@ export default function TeacherDashboard({ user, setUser }) {
                       <Users className="mr-2 h-5 w-5" />
                       Estudiantes y Calificaciones
                     </CardTitle>
-                    <CardDescription>{students.length} estudiante(s) inscrito(s)</CardDescription>
+                    <CardDescription>{studentCount} estudiante(s) inscrito(s)</CardDescription>
                   </CardHeader>
                   <CardContent>
                     {grades.length > 0 ? (
@@ -440,16 +487,16 @@ export default function TeacherDashboard({ user, setUser }) {
                           <TableHeader>
                             <TableRow>
                               <TableHead>Estudiante</TableHead>
-                              <TableHead className="text-center">Corte 1 (30%)</TableHead>
-                              <TableHead className="text-center">Corte 2 (35%)</TableHead>
-                              <TableHead className="text-center">Corte 3 (35%)</TableHead>
+                              <TableHead className="text-center">{labels[0]}</TableHead>
+                              <TableHead className="text-center">{labels[1]}</TableHead>
+                              <TableHead className="text-center">{labels[2]}</TableHead>
                               <TableHead className="text-center">Nota Final</TableHead>
                               <TableHead className="text-center">Acciones</TableHead>
                             </TableRow>
                           </TableHeader>
                           <TableBody>
                             {grades.map((grade) => (
-                              <TableRow key={grade.id} data-testid={`grade-row-${grade.student_name}`}>
+                              <TableRow key={grade.enrollment_id} data-testid={`grade-row-${grade.student_name}`}>
                                 <TableCell className="font-medium">{grade.student_name}</TableCell>
                                 <TableCell className="text-center">{grade.corte1 !== null ? grade.corte1 : '-'}</TableCell>
                                 <TableCell className="text-center">{grade.corte2 !== null ? grade.corte2 : '-'}</TableCell>
@@ -568,7 +615,7 @@ export default function TeacherDashboard({ user, setUser }) {
           </DialogHeader>
           <form onSubmit={handleUpdateGrade} className="space-y-4">
             <div className="space-y-2">
-              <Label htmlFor="corte1">Corte 1 (30%) - Escala 0.0 a 5.0</Label>
+              <Label htmlFor="corte1">{labels[0]} - Escala 0.0 a 5.0</Label>
               <Input
                 id="corte1"
                 type="number"
@@ -582,7 +629,7 @@ export default function TeacherDashboard({ user, setUser }) {
               />
             </div>
             <div className="space-y-2">
-              <Label htmlFor="corte2">Corte 2 (35%) - Escala 0.0 a 5.0</Label>
+              <Label htmlFor="corte2">{labels[1]} - Escala 0.0 a 5.0</Label>
               <Input
                 id="corte2"
                 type="number"
@@ -596,7 +643,7 @@ export default function TeacherDashboard({ user, setUser }) {
               />
             </div>
             <div className="space-y-2">
-              <Label htmlFor="corte3">Corte 3 (35%) - Escala 0.0 a 5.0</Label>
+              <Label htmlFor="corte3">{labels[2]} - Escala 0.0 a 5.0</Label>
               <Input
                 id="corte3"
                 type="number"
@@ -0,0 +1,67 @@
+/*
+  # Single round-trip grade upsert
+
+  1. New Functions
+    - `upsert_grade(p_teacher_id, p_enrollment_id, p_corte1, p_corte2, p_corte3)`
+      - Raises P0002 when the enrollment (or its grade row) does not exist
+      - Raises 42501 when the course is not taught by `p_teacher_id`
+      - Merges the provided cortes with the stored ones, recomputes
+        `final_grade` (30/35/35) and touches `last_updated`
+      - Returns the updated grade row plus `course_name` as jsonb
+
+  2. Notes
+    - Replaces the enrollment, course, grade, update and re-select round
+      trips made by the API with a single call
+*/
+
+CREATE OR REPLACE FUNCTION upsert_grade(
+  p_teacher_id uuid,
+  p_enrollment_id uuid,
+  p_corte1 numeric DEFAULT NULL,
+  p_corte2 numeric DEFAULT NULL,
+  p_corte3 numeric DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_course courses%ROWTYPE;
+  v_grade grades%ROWTYPE;
+BEGIN
+  SELECT c.* INTO v_course
+  FROM enrollments e
+  JOIN courses c ON c.id = e.course_id
+  WHERE e.id = p_enrollment_id;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Inscripción no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_course.teacher_id <> p_teacher_id THEN
+    RAISE EXCEPTION 'No autorizado' USING ERRCODE = '42501';
+  END IF;
+
+  UPDATE grades g
+  SET corte1 = COALESCE(p_corte1, g.corte1),
+      corte2 = COALESCE(p_corte2, g.corte2),
+      corte3 = COALESCE(p_corte3, g.corte3),
+      final_grade = COALESCE(
+        round(
+          COALESCE(p_corte1, g.corte1) * 0.3
+          + COALESCE(p_corte2, g.corte2) * 0.35
+          + COALESCE(p_corte3, g.corte3) * 0.35,
+          2
+        ),
+        g.final_grade
+      ),
+      last_updated = now()
+  WHERE g.enrollment_id = p_enrollment_id
+  RETURNING g.* INTO v_grade;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Calificación no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  RETURN to_jsonb(v_grade) || jsonb_build_object('course_name', v_course.name);
+END;
+$$;
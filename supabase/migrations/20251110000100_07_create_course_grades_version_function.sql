@@ -0,0 +1,28 @@
+/*
+  # Cheap version stamp for a course's grades
+
+  1. New Functions
+    - `course_grades_version(p_course_id)`
+      - Returns `{count, last_updated}` for the course's grade rows, used to
+        key cached PDF exports and to answer `If-None-Match` without
+        reading every row
+
+  2. Notes
+    - Served by `idx_grades_course_id`; the composite index below lets the
+      max(last_updated) lookup stay index-only as courses grow
+*/
+
+CREATE INDEX IF NOT EXISTS idx_grades_course_id_last_updated ON grades(course_id, last_updated);
+
+CREATE OR REPLACE FUNCTION course_grades_version(p_course_id uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'count', count(*),
+    'last_updated', max(last_updated)
+  )
+  FROM grades
+  WHERE course_id = p_course_id;
+$$;
@@ -0,0 +1,58 @@
+/*
+  # Keyset paging and bulk read for notifications
+
+  1. New Functions
+    - `notifications_page(p_user_id, p_limit, p_before_created_at, p_before_id)`
+      - Returns up to `p_limit` notifications ordered by `(created_at, id)`
+        descending, starting strictly after the given cursor (or from the
+        newest row when no cursor is passed)
+    - `mark_notifications_read(p_user_id, p_ids)`
+      - Marks the given notifications (or every notification when `p_ids`
+        is null) as read in one UPDATE and returns the number of rows that
+        changed from unread to read
+
+  2. Notes
+    - `idx_notifications_user_created_id` serves each page as a single
+      index range scan, so deep pages cost the same as the first one
+    - `idx_notifications_user_unread` is partial, so counting unread rows
+      only touches unread notifications
+*/
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_created_id ON notifications(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_notifications_user_unread ON notifications(user_id) WHERE read = false;
+
+CREATE OR REPLACE FUNCTION notifications_page(
+  p_user_id uuid,
+  p_limit integer,
+  p_before_created_at timestamptz DEFAULT NULL,
+  p_before_id uuid DEFAULT NULL
+)
+RETURNS SETOF notifications
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT *
+  FROM notifications
+  WHERE user_id = p_user_id
+    AND (p_before_created_at IS NULL OR (created_at, id) < (p_before_created_at, p_before_id))
+  ORDER BY created_at DESC, id DESC
+  LIMIT p_limit;
+$$;
+
+CREATE OR REPLACE FUNCTION mark_notifications_read(p_user_id uuid, p_ids uuid[] DEFAULT NULL)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_count integer;
+BEGIN
+  UPDATE notifications
+  SET read = true
+  WHERE user_id = p_user_id
+    AND read = false
+    AND (p_ids IS NULL OR id = ANY(p_ids));
+
+  GET DIAGNOSTICS v_count = ROW_COUNT;
+  RETURN v_count;
+END;
+$$;
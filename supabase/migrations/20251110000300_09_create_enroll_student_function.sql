@@ -0,0 +1,38 @@
+/*
+  # Atomic enrollment
+
+  1. New Functions
+    - `enroll_student(p_student_id, p_student_name, p_course_id)`
+      - Inserts the enrollment and its empty grade row in one transaction
+      - Relies on `UNIQUE(student_id, course_id)` instead of a pre-check:
+        a duplicate enrollment raises 23505 and nothing is written
+      - Raises 23503 when the course no longer exists
+      - Returns the enrollment row as jsonb
+
+  2. Notes
+    - Replaces the existing-enrollment check and the two inserts made by the
+      API, so concurrent enrollments can no longer leave an enrollment
+      without its grade row
+*/
+
+CREATE OR REPLACE FUNCTION enroll_student(
+  p_student_id uuid,
+  p_student_name text,
+  p_course_id uuid
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_enrollment enrollments%ROWTYPE;
+BEGIN
+  INSERT INTO enrollments (student_id, course_id)
+  VALUES (p_student_id, p_course_id)
+  RETURNING * INTO v_enrollment;
+
+  INSERT INTO grades (enrollment_id, course_id, student_id, student_name, last_updated)
+  VALUES (v_enrollment.id, p_course_id, p_student_id, p_student_name, now());
+
+  RETURN to_jsonb(v_enrollment);
+END;
+$$;
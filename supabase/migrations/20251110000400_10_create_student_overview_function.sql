@@ -0,0 +1,35 @@
+/*
+  # Student dashboard overview
+
+  1. New Functions
+    - `student_overview(p_student_id)`
+      - Returns `{courses, unread_notifications}` as jsonb, where each course
+        carries the student's grade row under `grade` (null if missing)
+      - Courses are ordered by enrollment date
+
+  2. Notes
+    - Replaces the enrollments, courses and per-course grade requests made
+      by the student dashboard with one call
+    - The unread count is served by `idx_notifications_user_unread`
+*/
+
+CREATE OR REPLACE FUNCTION student_overview(p_student_id uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT jsonb_build_object(
+    'courses', COALESCE((
+      SELECT jsonb_agg(to_jsonb(c) || jsonb_build_object('grade', to_jsonb(g)) ORDER BY e.enrolled_at, c.id)
+      FROM enrollments e
+      JOIN courses c ON c.id = e.course_id
+      LEFT JOIN grades g ON g.enrollment_id = e.id
+      WHERE e.student_id = p_student_id
+    ), '[]'::jsonb),
+    'unread_notifications', (
+      SELECT count(*)
+      FROM notifications
+      WHERE user_id = p_student_id AND read = false
+    )
+  );
+$$;
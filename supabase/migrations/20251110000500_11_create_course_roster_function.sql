@@ -0,0 +1,107 @@
+/*
+  # Course roster
+
+  1. New Functions
+    - `course_roster(p_teacher_id, p_course_id, p_sort, p_desc, p_limit, p_offset, p_after_key, p_after_id)`
+      - Raises P0002 when the course does not exist and 42501 when it is not
+        taught by `p_teacher_id`
+      - Returns `{total, rows}` as jsonb; each row joins the enrollment, the
+        student's user record and the grade row
+      - Sorts by `p_sort` (`student_name`, `email`, `enrolled_at`, `corte1`,
+        `corte2`, `corte3` or `final_grade`) with `enrollment_id` as tie
+        breaker; missing grades sort as -1
+      - Pages by `p_offset`, or by keyset when `p_after_key`/`p_after_id`
+        (the `sort_key` and `enrollment_id` of the last row seen) are given;
+        `p_after_key` is cast to the sort column's type, so it must come from
+        a page with the same `p_sort` (22P02 otherwise). The API cursor
+        records the sort and order it was issued for and rejects any other
+
+  2. Notes
+    - Replaces the two ownership checks and the enrollments, users and
+      grades queries made by the teacher dashboard with one call
+*/
+
+CREATE OR REPLACE FUNCTION course_roster(
+  p_teacher_id uuid,
+  p_course_id uuid,
+  p_sort text DEFAULT 'student_name',
+  p_desc boolean DEFAULT false,
+  p_limit integer DEFAULT 100,
+  p_offset integer DEFAULT 0,
+  p_after_key text DEFAULT NULL,
+  p_after_id uuid DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+  v_teacher_id uuid;
+  v_key text;
+  v_type text := 'numeric';
+  v_direction text := CASE WHEN p_desc THEN 'DESC' ELSE 'ASC' END;
+  v_comparison text := CASE WHEN p_desc THEN '<' ELSE '>' END;
+  v_result jsonb;
+BEGIN
+  SELECT teacher_id INTO v_teacher_id FROM courses WHERE id = p_course_id;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Curso no encontrado' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_teacher_id <> p_teacher_id THEN
+    RAISE EXCEPTION 'No autorizado' USING ERRCODE = '42501';
+  END IF;
+
+  CASE p_sort
+    WHEN 'student_name' THEN v_key := 'lower(u.full_name)'; v_type := 'text';
+    WHEN 'email' THEN v_key := 'lower(u.email)'; v_type := 'text';
+    WHEN 'enrolled_at' THEN v_key := 'e.enrolled_at'; v_type := 'timestamptz';
+    WHEN 'corte1' THEN v_key := 'COALESCE(g.corte1, -1)';
+    WHEN 'corte2' THEN v_key := 'COALESCE(g.corte2, -1)';
+    WHEN 'corte3' THEN v_key := 'COALESCE(g.corte3, -1)';
+    WHEN 'final_grade' THEN v_key := 'COALESCE(g.final_grade, -1)';
+    ELSE RAISE EXCEPTION 'Campo de ordenamiento inválido' USING ERRCODE = '22023';
+  END CASE;
+
+  EXECUTE format($query$
+    WITH roster AS (
+      SELECT
+        e.id AS enrollment_id,
+        e.enrolled_at,
+        u.id AS student_id,
+        u.full_name AS student_name,
+        u.email,
+        g.id AS grade_id,
+        g.corte1,
+        g.corte2,
+        g.corte3,
+        g.final_grade,
+        g.last_updated,
+        %1$s AS sort_key
+      FROM enrollments e
+      JOIN users u ON u.id = e.student_id
+      LEFT JOIN grades g ON g.enrollment_id = e.id
+      WHERE e.course_id = $1
+    ),
+    page AS (
+      SELECT *
+      FROM roster
+      WHERE $2 IS NULL OR (sort_key, enrollment_id) %3$s ($2::%4$s, $3)
+      ORDER BY sort_key %2$s, enrollment_id %2$s
+      LIMIT $4 OFFSET $5
+    )
+    SELECT jsonb_build_object(
+      'total', (SELECT count(*) FROM roster),
+      'rows', COALESCE(
+        (SELECT jsonb_agg(to_jsonb(page) || jsonb_build_object('sort_key', page.sort_key::text) ORDER BY sort_key %2$s, enrollment_id %2$s) FROM page),
+        '[]'::jsonb
+      )
+    )
+  $query$, v_key, v_direction, v_comparison, v_type)
+  INTO v_result
+  USING p_course_id, p_after_key, p_after_id, p_limit, p_offset;
+
+  RETURN v_result;
+END;
+$$;
@@ -0,0 +1,243 @@
+/*
+  # Incrementally maintained per-course grade summaries
+
+  1. New Tables
+    - `course_grade_summaries`
+      - `course_id` (uuid, primary key) - Foreign key to courses table
+      - `students` (integer) - Grade rows (one per enrollment) in the course
+      - `pending_cortes` (integer) - Cortes not graded yet across all rows
+      - `<column>_count`, `<column>_sum`, `<column>_sumsq` for `corte1`,
+        `corte2`, `corte3` and `final_grade` - Non-null values, their sum
+        and their sum of squares
+      - `updated_at` (timestamptz) - Last change applied
+
+  2. New Functions
+    - `apply_grade_summary_changes()` - Statement-level trigger on `grades`;
+      folds the transition tables into one delta per course and applies it
+      with a single upsert, so a bulk save touches each summary row once
+    - `course_grade_summary(p_course_id)` - The summary row as jsonb, or
+      zeros when the course has no grade rows yet
+    - `rebuild_course_grade_summaries(p_course_id, p_apply)` - Recomputes the
+      summaries (all courses when `p_course_id` is NULL) from `grades` and
+      returns the courses whose stored summary drifted, as
+      `[{course_id, stored, expected}]`; writes the recomputed rows unless
+      `p_apply` is false
+
+  3. Notes
+    - Inserts (enrollments), updates (grade entry) and deletes (course or
+      enrollment removal cascading to `grades`) are all covered by the
+      triggers, so reads are O(1) per course
+    - Deleting a course cascades to its summary; deltas for courses that no
+      longer exist are skipped
+    - Every write to `grades` also updates the one summary row of each course
+      it touches, so concurrent grade saves in the same course queue on that
+      row lock until the saving transaction commits; different courses do
+      not contend
+    - The table is read-only for clients (RLS with a SELECT policy only); the
+      trigger and rebuild functions are SECURITY DEFINER with a fixed
+      search_path, so roles allowed to write `grades` do not need write access
+      to the summaries
+*/
+
+CREATE TABLE IF NOT EXISTS course_grade_summaries (
+  course_id uuid PRIMARY KEY REFERENCES courses(id) ON DELETE CASCADE,
+  students integer NOT NULL DEFAULT 0,
+  pending_cortes integer NOT NULL DEFAULT 0,
+  corte1_count integer NOT NULL DEFAULT 0,
+  corte1_sum numeric NOT NULL DEFAULT 0,
+  corte1_sumsq numeric NOT NULL DEFAULT 0,
+  corte2_count integer NOT NULL DEFAULT 0,
+  corte2_sum numeric NOT NULL DEFAULT 0,
+  corte2_sumsq numeric NOT NULL DEFAULT 0,
+  corte3_count integer NOT NULL DEFAULT 0,
+  corte3_sum numeric NOT NULL DEFAULT 0,
+  corte3_sumsq numeric NOT NULL DEFAULT 0,
+  final_grade_count integer NOT NULL DEFAULT 0,
+  final_grade_sum numeric NOT NULL DEFAULT 0,
+  final_grade_sumsq numeric NOT NULL DEFAULT 0,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE course_grade_summaries ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone authenticated can read grade summaries"
+  ON course_grade_summaries FOR SELECT
+  TO authenticated
+  USING (true);
+
+CREATE OR REPLACE FUNCTION apply_grade_summary_changes()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_changes text;
+BEGIN
+  -- old_rows/new_rows only exist for the events that define them, so the
+  -- change set is assembled per event and the statement run dynamically
+  v_changes := CASE TG_OP
+    WHEN 'INSERT' THEN 'SELECT 1 AS sign, course_id, corte1, corte2, corte3, final_grade FROM new_rows'
+    WHEN 'DELETE' THEN 'SELECT -1 AS sign, course_id, corte1, corte2, corte3, final_grade FROM old_rows'
+    ELSE 'SELECT 1 AS sign, course_id, corte1, corte2, corte3, final_grade FROM new_rows
+          UNION ALL
+          SELECT -1, course_id, corte1, corte2, corte3, final_grade FROM old_rows'
+  END;
+
+  EXECUTE 'WITH changes AS (' || v_changes || $sql$  ),
+  delta AS (
+    SELECT
+      course_id,
+      sum(sign)::integer AS students,
+      sum(sign * ((corte1 IS NULL)::integer + (corte2 IS NULL)::integer + (corte3 IS NULL)::integer))::integer AS pending_cortes,
+      sum(sign * (corte1 IS NOT NULL)::integer)::integer AS corte1_count,
+      COALESCE(sum(sign * corte1), 0) AS corte1_sum,
+      COALESCE(sum(sign * corte1 * corte1), 0) AS corte1_sumsq,
+      sum(sign * (corte2 IS NOT NULL)::integer)::integer AS corte2_count,
+      COALESCE(sum(sign * corte2), 0) AS corte2_sum,
+      COALESCE(sum(sign * corte2 * corte2), 0) AS corte2_sumsq,
+      sum(sign * (corte3 IS NOT NULL)::integer)::integer AS corte3_count,
+      COALESCE(sum(sign * corte3), 0) AS corte3_sum,
+      COALESCE(sum(sign * corte3 * corte3), 0) AS corte3_sumsq,
+      sum(sign * (final_grade IS NOT NULL)::integer)::integer AS final_grade_count,
+      COALESCE(sum(sign * final_grade), 0) AS final_grade_sum,
+      COALESCE(sum(sign * final_grade * final_grade), 0) AS final_grade_sumsq
+    FROM changes
+    GROUP BY course_id
+  )
+  INSERT INTO course_grade_summaries AS s (
+    course_id, students, pending_cortes,
+    corte1_count, corte1_sum, corte1_sumsq,
+    corte2_count, corte2_sum, corte2_sumsq,
+    corte3_count, corte3_sum, corte3_sumsq,
+    final_grade_count, final_grade_sum, final_grade_sumsq,
+    updated_at
+  )
+  SELECT d.*, now()
+  FROM delta d
+  WHERE EXISTS (SELECT 1 FROM courses c WHERE c.id = d.course_id)
+  ON CONFLICT (course_id) DO UPDATE SET
+    students = s.students + EXCLUDED.students,
+    pending_cortes = s.pending_cortes + EXCLUDED.pending_cortes,
+    corte1_count = s.corte1_count + EXCLUDED.corte1_count,
+    corte1_sum = s.corte1_sum + EXCLUDED.corte1_sum,
+    corte1_sumsq = s.corte1_sumsq + EXCLUDED.corte1_sumsq,
+    corte2_count = s.corte2_count + EXCLUDED.corte2_count,
+    corte2_sum = s.corte2_sum + EXCLUDED.corte2_sum,
+    corte2_sumsq = s.corte2_sumsq + EXCLUDED.corte2_sumsq,
+    corte3_count = s.corte3_count + EXCLUDED.corte3_count,
+    corte3_sum = s.corte3_sum + EXCLUDED.corte3_sum,
+    corte3_sumsq = s.corte3_sumsq + EXCLUDED.corte3_sumsq,
+    final_grade_count = s.final_grade_count + EXCLUDED.final_grade_count,
+    final_grade_sum = s.final_grade_sum + EXCLUDED.final_grade_sum,
+    final_grade_sumsq = s.final_grade_sumsq + EXCLUDED.final_grade_sumsq,
+    updated_at = EXCLUDED.updated_at
+  $sql$;
+
+  RETURN NULL;
+END;
+$$;
+
+-- Transition tables are only allowed on single-event triggers
+DROP TRIGGER IF EXISTS grades_summary_insert ON grades;
+CREATE TRIGGER grades_summary_insert
+  AFTER INSERT ON grades
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_grade_summary_changes();
+
+DROP TRIGGER IF EXISTS grades_summary_update ON grades;
+CREATE TRIGGER grades_summary_update
+  AFTER UPDATE ON grades
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_grade_summary_changes();
+
+DROP TRIGGER IF EXISTS grades_summary_delete ON grades;
+CREATE TRIGGER grades_summary_delete
+  AFTER DELETE ON grades
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION apply_grade_summary_changes();
+
+CREATE OR REPLACE FUNCTION course_grade_summary(p_course_id uuid)
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT COALESCE(
+    (SELECT to_jsonb(s) FROM course_grade_summaries s WHERE s.course_id = p_course_id),
+    jsonb_build_object('course_id', p_course_id, 'students', 0, 'pending_cortes', 0, 'updated_at', NULL)
+  );
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_course_grade_summaries(
+  p_course_id uuid DEFAULT NULL,
+  p_apply boolean DEFAULT true
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+DECLARE
+  v_drift jsonb;
+BEGIN
+  CREATE TEMP TABLE expected_summaries AS
+  SELECT
+    c.id AS course_id,
+    count(g.id)::integer AS students,
+    COALESCE(sum((g.corte1 IS NULL)::integer + (g.corte2 IS NULL)::integer + (g.corte3 IS NULL)::integer) FILTER (WHERE g.id IS NOT NULL), 0)::integer AS pending_cortes,
+    count(g.corte1)::integer AS corte1_count,
+    COALESCE(sum(g.corte1), 0) AS corte1_sum,
+    COALESCE(sum(g.corte1 * g.corte1), 0) AS corte1_sumsq,
+    count(g.corte2)::integer AS corte2_count,
+    COALESCE(sum(g.corte2), 0) AS corte2_sum,
+    COALESCE(sum(g.corte2 * g.corte2), 0) AS corte2_sumsq,
+    count(g.corte3)::integer AS corte3_count,
+    COALESCE(sum(g.corte3), 0) AS corte3_sum,
+    COALESCE(sum(g.corte3 * g.corte3), 0) AS corte3_sumsq,
+    count(g.final_grade)::integer AS final_grade_count,
+    COALESCE(sum(g.final_grade), 0) AS final_grade_sum,
+    COALESCE(sum(g.final_grade * g.final_grade), 0) AS final_grade_sumsq
+  FROM courses c
+  LEFT JOIN grades g ON g.course_id = c.id
+  WHERE p_course_id IS NULL OR c.id = p_course_id
+  GROUP BY c.id;
+
+  SELECT COALESCE(jsonb_agg(jsonb_build_object(
+    'course_id', e.course_id,
+    'stored', to_jsonb(s) - 'course_id' - 'updated_at',
+    'expected', to_jsonb(e) - 'course_id'
+  )), '[]'::jsonb)
+  INTO v_drift
+  FROM expected_summaries e
+  LEFT JOIN course_grade_summaries s ON s.course_id = e.course_id
+  WHERE (s.course_id IS NULL AND e.students > 0)
+     OR (to_jsonb(s) - 'course_id' - 'updated_at') <> (to_jsonb(e) - 'course_id');
+
+  IF p_apply THEN
+    INSERT INTO course_grade_summaries AS s
+    SELECT e.*, now() FROM expected_summaries e
+    ON CONFLICT (course_id) DO UPDATE SET
+      students = EXCLUDED.students,
+      pending_cortes = EXCLUDED.pending_cortes,
+      corte1_count = EXCLUDED.corte1_count,
+      corte1_sum = EXCLUDED.corte1_sum,
+      corte1_sumsq = EXCLUDED.corte1_sumsq,
+      corte2_count = EXCLUDED.corte2_count,
+      corte2_sum = EXCLUDED.corte2_sum,
+      corte2_sumsq = EXCLUDED.corte2_sumsq,
+      corte3_count = EXCLUDED.corte3_count,
+      corte3_sum = EXCLUDED.corte3_sum,
+      corte3_sumsq = EXCLUDED.corte3_sumsq,
+      final_grade_count = EXCLUDED.final_grade_count,
+      final_grade_sum = EXCLUDED.final_grade_sum,
+      final_grade_sumsq = EXCLUDED.final_grade_sumsq,
+      updated_at = EXCLUDED.updated_at;
+  END IF;
+
+  DROP TABLE expected_summaries;
+  RETURN v_drift;
+END;
+$$;
+
+-- Backfill existing courses
+SELECT rebuild_course_grade_summaries();
@@ -0,0 +1,76 @@
+/*
+  # Optimistic concurrency for grade entry
+
+  1. Changed Functions
+    - `upsert_grade(p_teacher_id, p_enrollment_id, p_corte1, p_corte2, p_corte3, p_expected_last_updated)`
+      - New optional `p_expected_last_updated`: when given, the row is only
+        updated if its `last_updated` still equals it; otherwise raises
+        40001 and nothing is written
+      - Everything else is unchanged (P0002 / 42501, merge of the provided
+        cortes, recomputed `final_grade`, returns the row plus `course_name`)
+
+  2. Notes
+    - Clients syncing with `GET /api/grades/course/{id}?since=` send the
+      `last_updated` they hold, so an edit made from a stale copy is rejected
+      instead of silently overwriting a newer one
+    - Delta reads use `idx_grades_course_id_last_updated`
+*/
+
+DROP FUNCTION IF EXISTS upsert_grade(uuid, uuid, numeric, numeric, numeric);
+
+CREATE OR REPLACE FUNCTION upsert_grade(
+  p_teacher_id uuid,
+  p_enrollment_id uuid,
+  p_corte1 numeric DEFAULT NULL,
+  p_corte2 numeric DEFAULT NULL,
+  p_corte3 numeric DEFAULT NULL,
+  p_expected_last_updated timestamptz DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_course courses%ROWTYPE;
+  v_grade grades%ROWTYPE;
+BEGIN
+  SELECT c.* INTO v_course
+  FROM enrollments e
+  JOIN courses c ON c.id = e.course_id
+  WHERE e.id = p_enrollment_id;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Inscripción no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_course.teacher_id <> p_teacher_id THEN
+    RAISE EXCEPTION 'No autorizado' USING ERRCODE = '42501';
+  END IF;
+
+  UPDATE grades g
+  SET corte1 = COALESCE(p_corte1, g.corte1),
+      corte2 = COALESCE(p_corte2, g.corte2),
+      corte3 = COALESCE(p_corte3, g.corte3),
+      final_grade = COALESCE(
+        round(
+          COALESCE(p_corte1, g.corte1) * 0.3
+          + COALESCE(p_corte2, g.corte2) * 0.35
+          + COALESCE(p_corte3, g.corte3) * 0.35,
+          2
+        ),
+        g.final_grade
+      ),
+      last_updated = now()
+  WHERE g.enrollment_id = p_enrollment_id
+    AND (p_expected_last_updated IS NULL OR g.last_updated = p_expected_last_updated)
+  RETURNING g.* INTO v_grade;
+
+  IF NOT FOUND THEN
+    IF EXISTS (SELECT 1 FROM grades WHERE enrollment_id = p_enrollment_id) THEN
+      RAISE EXCEPTION 'La calificación fue modificada' USING ERRCODE = '40001';
+    END IF;
+    RAISE EXCEPTION 'Calificación no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  RETURN to_jsonb(v_grade) || jsonb_build_object('course_name', v_course.name);
+END;
+$$;
@@ -0,0 +1,166 @@
+/*
+  # Per-course grading schemes
+
+  1. Modified Tables
+    - `courses`
+      - `grading_scheme` (jsonb, nullable) - `{components: [{column, name,
+        weight}], decimals, rounding}`; each component weighs one of
+        `corte1`..`corte3`, weights sum to 1, `decimals` is 0-2 and
+        `rounding` is `half_up`, `floor` or `ceil`. NULL means the default
+        30/35/35 over the three cortes, rounded half up to 2 decimals
+
+  2. New Functions
+    - `scheme_final_grade(p_scheme, p_corte1, p_corte2, p_corte3)` - Final
+      grade under a scheme, NULL while a weighted corte is missing
+    - `set_final_grades(p_ids, p_final_grades, p_last_updated)` - Writes
+      recomputed final grades for many rows in one statement, touching
+      `last_updated` only on rows whose value changed
+      - A row is only written if its `last_updated` still equals the one in
+        `p_last_updated`, i.e. the cortes the grade was computed from are
+        still the stored ones
+      - Returns `{changed, skipped}`: the number of rows written and the ids
+        that were not (changed in between, already equal or gone)
+
+  3. Changed Functions
+    - `upsert_grade` computes `final_grade` with the course's scheme
+
+  4. Notes
+    - The API validates schemes before storing them and recomputes the
+      affected courses in one vectorized pass, writing them with a single
+      `set_final_grades` call
+    - A grade saved between that read and the write is skipped rather than
+      overwritten with a final grade computed from its old cortes; the API
+      re-reads and recomputes the skipped rows
+*/
+
+ALTER TABLE courses ADD COLUMN IF NOT EXISTS grading_scheme jsonb;
+
+CREATE OR REPLACE FUNCTION scheme_final_grade(
+  p_scheme jsonb,
+  p_corte1 numeric,
+  p_corte2 numeric,
+  p_corte3 numeric
+)
+RETURNS numeric
+LANGUAGE plpgsql
+IMMUTABLE
+AS $$
+DECLARE
+  v_scheme jsonb := COALESCE(p_scheme, '{
+    "components": [
+      {"column": "corte1", "weight": 0.3},
+      {"column": "corte2", "weight": 0.35},
+      {"column": "corte3", "weight": 0.35}
+    ],
+    "decimals": 2,
+    "rounding": "half_up"
+  }'::jsonb);
+  v_component jsonb;
+  v_value numeric;
+  v_total numeric := 0;
+  v_scale numeric;
+BEGIN
+  FOR v_component IN SELECT * FROM jsonb_array_elements(v_scheme -> 'components') LOOP
+    v_value := CASE v_component ->> 'column'
+      WHEN 'corte1' THEN p_corte1
+      WHEN 'corte2' THEN p_corte2
+      WHEN 'corte3' THEN p_corte3
+    END;
+    IF v_value IS NULL THEN
+      RETURN NULL;
+    END IF;
+    v_total := v_total + v_value * (v_component ->> 'weight')::numeric;
+  END LOOP;
+
+  v_scale := power(10::numeric, COALESCE((v_scheme ->> 'decimals')::integer, 2));
+  RETURN CASE COALESCE(v_scheme ->> 'rounding', 'half_up')
+    WHEN 'floor' THEN floor(v_total * v_scale) / v_scale
+    WHEN 'ceil' THEN ceil(v_total * v_scale) / v_scale
+    ELSE round(v_total * v_scale) / v_scale
+  END;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION upsert_grade(
+  p_teacher_id uuid,
+  p_enrollment_id uuid,
+  p_corte1 numeric DEFAULT NULL,
+  p_corte2 numeric DEFAULT NULL,
+  p_corte3 numeric DEFAULT NULL,
+  p_expected_last_updated timestamptz DEFAULT NULL
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_course courses%ROWTYPE;
+  v_grade grades%ROWTYPE;
+BEGIN
+  SELECT c.* INTO v_course
+  FROM enrollments e
+  JOIN courses c ON c.id = e.course_id
+  WHERE e.id = p_enrollment_id;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Inscripción no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_course.teacher_id <> p_teacher_id THEN
+    RAISE EXCEPTION 'No autorizado' USING ERRCODE = '42501';
+  END IF;
+
+  UPDATE grades g
+  SET corte1 = COALESCE(p_corte1, g.corte1),
+      corte2 = COALESCE(p_corte2, g.corte2),
+      corte3 = COALESCE(p_corte3, g.corte3),
+      final_grade = COALESCE(
+        scheme_final_grade(
+          v_course.grading_scheme,
+          COALESCE(p_corte1, g.corte1),
+          COALESCE(p_corte2, g.corte2),
+          COALESCE(p_corte3, g.corte3)
+        ),
+        g.final_grade
+      ),
+      last_updated = now()
+  WHERE g.enrollment_id = p_enrollment_id
+    AND (p_expected_last_updated IS NULL OR g.last_updated = p_expected_last_updated)
+  RETURNING g.* INTO v_grade;
+
+  IF NOT FOUND THEN
+    IF EXISTS (SELECT 1 FROM grades WHERE enrollment_id = p_enrollment_id) THEN
+      RAISE EXCEPTION 'La calificación fue modificada' USING ERRCODE = '40001';
+    END IF;
+    RAISE EXCEPTION 'Calificación no encontrada' USING ERRCODE = 'P0002';
+  END IF;
+
+  RETURN to_jsonb(v_grade) || jsonb_build_object('course_name', v_course.name);
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION set_final_grades(
+  p_ids uuid[],
+  p_final_grades numeric[],
+  p_last_updated timestamptz[]
+)
+RETURNS jsonb
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT * FROM unnest(p_ids, p_final_grades, p_last_updated) AS u(id, final_grade, last_updated)
+  ),
+  changed AS (
+    UPDATE grades g
+    SET final_grade = u.final_grade,
+        last_updated = now()
+    FROM input u
+    WHERE g.id = u.id
+      AND g.last_updated = u.last_updated
+      AND g.final_grade IS DISTINCT FROM u.final_grade
+    RETURNING g.id
+  )
+  SELECT jsonb_build_object(
+    'changed', (SELECT count(*) FROM changed),
+    'skipped', COALESCE((SELECT jsonb_agg(u.id) FROM input u WHERE u.id NOT IN (SELECT id FROM changed)), '[]'::jsonb)
+  );
+$$;
@@ -0,0 +1,96 @@
+/*
+  # Bulk grade entry merged in the database
+
+  1. New Functions
+    - `bulk_upsert_grades(p_teacher_id, p_course_id, p_rows)` - Applies many
+      grade rows of one course in a single UPDATE
+      - `p_rows` is a jsonb array of `{enrollment_id, corte1, corte2, corte3,
+        expected_last_updated}`; missing or null cortes keep their stored
+        value, as in `upsert_grade`
+      - A row with `expected_last_updated` is only written if the stored
+        `last_updated` still equals it
+      - `final_grade` is computed with the course's scheme from the merged
+        cortes
+      - Raises P0002 if the course does not exist and 42501 if
+        `p_teacher_id` does not own it
+      - Returns one `{position, status, grade}` entry per input row, in input
+        order; `status` is `ok`, `conflict` (`expected_last_updated` no
+        longer matches; nothing written for that row) or `not_found` (no
+        grade row for that enrollment in this course)
+
+  2. Notes
+    - The merge happens inside the UPDATE, which locks each row it writes and
+      reads its latest committed version, so a concurrent `upsert_grade` on
+      the same enrollment is either applied first and merged, or waits; it is
+      never overwritten with a stale copy
+    - The `last_updated` comparison is part of the UPDATE's WHERE clause, so
+      it is rechecked against the locked row: of two sessions sending the
+      same `expected_last_updated`, the second one gets `conflict`
+    - One statement means the summary triggers run once per batch
+    - Callers must not send the same enrollment twice in one batch
+*/
+
+CREATE OR REPLACE FUNCTION bulk_upsert_grades(
+  p_teacher_id uuid,
+  p_course_id uuid,
+  p_rows jsonb
+)
+RETURNS jsonb
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_course courses%ROWTYPE;
+  v_result jsonb;
+BEGIN
+  SELECT * INTO v_course FROM courses WHERE id = p_course_id;
+
+  IF NOT FOUND THEN
+    RAISE EXCEPTION 'Curso no encontrado' USING ERRCODE = 'P0002';
+  END IF;
+
+  IF v_course.teacher_id <> p_teacher_id THEN
+    RAISE EXCEPTION 'No autorizado' USING ERRCODE = '42501';
+  END IF;
+
+  WITH input AS (
+    SELECT i.position - 1 AS position, i.enrollment_id, i.corte1, i.corte2, i.corte3, i.expected_last_updated
+    FROM jsonb_to_recordset(p_rows) WITH ORDINALITY
+      AS i(enrollment_id uuid, corte1 numeric, corte2 numeric, corte3 numeric, expected_last_updated timestamptz, position bigint)
+  ),
+  updated AS (
+    UPDATE grades g
+    SET corte1 = COALESCE(i.corte1, g.corte1),
+        corte2 = COALESCE(i.corte2, g.corte2),
+        corte3 = COALESCE(i.corte3, g.corte3),
+        final_grade = COALESCE(
+          scheme_final_grade(
+            v_course.grading_scheme,
+            COALESCE(i.corte1, g.corte1),
+            COALESCE(i.corte2, g.corte2),
+            COALESCE(i.corte3, g.corte3)
+          ),
+          g.final_grade
+        ),
+        last_updated = now()
+    FROM input i
+    WHERE g.enrollment_id = i.enrollment_id
+      AND g.course_id = p_course_id
+      AND (i.expected_last_updated IS NULL OR g.last_updated = i.expected_last_updated)
+    RETURNING i.position, g.*
+  )
+  SELECT COALESCE(jsonb_agg(
+    CASE
+      WHEN u.position IS NOT NULL THEN jsonb_build_object('position', i.position, 'status', 'ok', 'grade', to_jsonb(u) - 'position')
+      WHEN EXISTS (SELECT 1 FROM grades g WHERE g.enrollment_id = i.enrollment_id AND g.course_id = p_course_id)
+        THEN jsonb_build_object('position', i.position, 'status', 'conflict')
+      ELSE jsonb_build_object('position', i.position, 'status', 'not_found')
+    END
+    ORDER BY i.position
+  ), '[]'::jsonb)
+  INTO v_result
+  FROM input i
+  LEFT JOIN updated u ON u.position = i.position;
+
+  RETURN v_result;
+END;
+$$;